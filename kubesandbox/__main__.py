@@ -3,20 +3,15 @@ from __future__ import annotations
 import logging
 import sys
 import time
-import traceback
-from os import system, name
-
-from pydantic import TypeAdapter
 
 from kubesandbox import config
 from kubesandbox.helm.helm_manager import HelmManager
-from kubesandbox.helm.model import HelmChart
 from kubesandbox.k3d.manager import K3dManager
 from kubesandbox.kubeclient.kubectl_manager import KubeManager
-from kubesandbox.kubeclient.model import KubeObject
 from kubesandbox.navigation import InputMenus
+from kubesandbox.planner.display import clear_screen
 from kubesandbox.planner.planner import ExecutionPlanner
-from kubesandbox.planner.support import Step, InstallationSource
+from kubesandbox.planner.support import Step
 from kubesandbox.shellclient.base_shell import Shell
 from kubesandbox.utilities.system_patcher import Patcher
 
@@ -27,43 +22,33 @@ helm_manager = HelmManager()
 kube_manager = KubeManager()
 
 
-def clear():
-    # for windows
-    if name == 'nt':
-        _ = system('cls')
-
-    # for mac and linux(here, os.name is 'posix')
-    else:
-        _ = system('clear')
-
-
 def prepare_ingress(ingress: str) -> Step | None:
     try:
         logger.info(f'Selected {ingress} ingress controller.')
-        ingress_chart = HelmChart.model_validate(config.deployment_config['helm']['ingressControllers'][ingress])
+        ingress_chart = config.get_helm_chart('ingressControllers', ingress)
         return helm_manager.generate_chart_installation_step(ingress_chart)
-    except:
-        logger.error(traceback.format_exc())
+    except (KeyError, ValueError):
+        # Missing deployment config entries or invalid custom messages, the component is skipped
+        logger.exception(f'Could not prepare the {ingress} ingress controller')
         return None
 
 
 def get_kubesphere():
     try:
         logger.info('Selected KubeSphere for cluster management.')
-        adapter = TypeAdapter(list[KubeObject])
-        ks_chart = adapter.validate_python(config.deployment_config['kubeyaml']['clusterManagers']['kubeSphere'])
+        ks_chart = config.get_kube_objects('clusterManagers', 'kubeSphere')
         return kube_manager.generate_kubectl_apply_step(ks_chart)
-    except:
-        logger.error(traceback.format_exc())
+    except (KeyError, ValueError):
+        logger.exception('Could not prepare KubeSphere')
         return None
 
 
 def get_rancher() -> Step | None:
     try:
-        rancher_chart = HelmChart.model_validate(config.deployment_config['helm']['clusterManagers']['rancher'])
+        rancher_chart = config.get_helm_chart('clusterManagers', 'rancher')
         return helm_manager.generate_chart_installation_step(rancher_chart)
-    except:
-        logger.error(traceback.format_exc())
+    except (KeyError, ValueError):
+        logger.exception('Could not prepare Rancher')
         return None
 
 
@@ -111,11 +96,9 @@ def process_build():
     if management_tool:
         build_steps.append(management_tool)
 
-    adapter = TypeAdapter(dict[str, InstallationSource])
-
     plan = ExecutionPlanner(
         steps=build_steps,
-        installation_sources=adapter.validate_json(config.installer_config)
+        installation_sources=config.get_installation_sources()
     )
 
     plan.execute()
@@ -134,11 +117,11 @@ def default_build(management_tool: str = None):
 
 
 def main():
-    clear()
+    clear_screen()
     logger.info('Starting App')
     choice = InputMenus.get_main_menu()
 
-    clear()
+    clear_screen()
     try:
         if choice == 'recreate':
             raise NotImplementedError('Recreate cluster is not yet implemented')
@@ -161,7 +144,7 @@ def main():
             sys.exit(0)
 
         time.sleep(3)
-        # clear()
+        # clear_screen()
         config.chores.cleanup()
     except Exception as e:
         config.chores.should_dump_output = False
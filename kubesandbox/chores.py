@@ -26,6 +26,7 @@ class Chores:
         self.should_dump_output = dump_output
         self.should_generate_report = generate_report
         self.storage = storage
+        self.cleanup_done = False
         Path(self.workdir).mkdir(parents=True, exist_ok=True)
 
     @staticmethod
@@ -40,12 +41,15 @@ class Chores:
             The indexed filename.
         """
         i = 0
-        name = filename.split('.')[0]
-        extension = filename.split('.')[1]
-        while os.path.exists(f'{name} ({i}).{extension}'):
+        name, extension = os.path.splitext(filename)
+        directory = os.path.dirname(filename)
+        with os.scandir(directory or '.') as entries:
+            existing = {os.path.join(directory, entry.name) for entry in entries}
+
+        while f'{name} ({i}){extension}' in existing:
             i += 1
 
-        return f'{name} ({i}).{extension}'
+        return f'{name} ({i}){extension}'
 
     @classmethod
     def get_valid_filename(cls, filename: str) -> str:
@@ -76,8 +80,7 @@ class Chores:
         filename = self.get_valid_filename(filename)
         with open(filename, 'w') as f:
             f.write('## Outputs\n')
-            for output in self.storage.outputs:
-                f.write(output.get_markdown())
+            f.writelines(output.get_markdown() for output in self.storage.outputs)
 
         self.storage.resources.append(
             Resource(
@@ -95,10 +98,7 @@ class Chores:
         Returns:
             A Markdown string containing all the notes.
         """
-        notes = '# Notes\n'
-        for message in self.storage.notes:
-            notes += message.get_markdown()
-        return notes
+        return '# Notes\n' + ''.join(message.get_markdown() for message in self.storage.notes)
 
     def get_resources_markdown(self):
         """
@@ -107,12 +107,8 @@ class Chores:
         Returns:
             A Markdown string containing a table of resources.
         """
-        resources_md = '# Resources\n'
-        resources_md += Resource.get_table_header()
-
-        for resource in self.storage.resources:
-            resources_md += resource.get_row_markdown()
-        return resources_md
+        return ('# Resources\n' + Resource.get_table_header() +
+                ''.join(resource.get_row_markdown() for resource in self.storage.resources))
 
     def generate_report(self, filename: str = 'report.md'):
         """
@@ -147,15 +143,23 @@ class Chores:
         """
         Deletes all temporary files created during the process.
         """
-        for file in self.storage.temp_files:
-            os.remove(file)
+        for file in dict.fromkeys(self.storage.temp_files):
+            try:
+                os.unlink(file)
+            except FileNotFoundError:
+                pass
+        self.storage.temp_files.clear()
 
     def cleanup(self):
         """
-        Performs cleanup tasks based on the configuration.
+        Performs cleanup tasks based on the configuration. Does nothing once a cleanup has completed.
         """
+        if self.cleanup_done:
+            return
+
         if self.should_dump_output and self.storage.outputs:
             self.dump_output('outputs.md')
         if self.should_generate_report:
             self.generate_report('report.md')
         self.delete_temporary_files()
+        self.cleanup_done = True
@@ -2,9 +2,20 @@ import json
 import logging.config
 import os
 import sys
+from functools import cache
 from pathlib import Path
 
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library parser is used when it is not installed
+    orjson = None
+
 from kubesandbox.chores import Chores
+from kubesandbox.helm.model import HelmChart
+from kubesandbox.kubeclient.model import KubeObject
+from kubesandbox.planner.support import InstallationSource
 from kubesandbox.storage import RuntimeData
 
 banner = r"""
@@ -25,68 +36,91 @@ intro = f'''
 home_dir = str(Path.home())
 workdir = os.environ.get('WORKDIR', os.path.join(home_dir, '.kubesandbox'))
 node_port_base = os.environ.get('NODE_PORT_BASE', '3200')
-generate_report = (os.environ.get('GENERATE_REPORT', 'true').lower() in ['true', '1', 'yes', 'y', 't'])
-dump_output = (os.environ.get('DUMP_OUTPUT', 'false').lower() in ['true', '1', 'yes', 'y', 't'])
-run_in_user_namespace = (os.environ.get('RUN_IN_USER_NAMESPACE', 'true').lower() in ['true', '1', 'yes', 'y', 't'])
+script_cache_dir = os.environ.get('SCRIPT_CACHE_DIR', os.path.join(home_dir, '.cache', 'kubesandbox', 'scripts'))
+truthy_values = frozenset({'true', '1', 'yes', 'y', 't'})
+
+
+def get_env_flag(variable: str, default: str) -> bool:
+    """
+    Reads a boolean flag from the environment.
+
+    Args:
+        variable: The name of the environment variable.
+        default: The value used when the variable is not set.
+
+    Returns:
+        True if the value is one of the truthy values, False otherwise.
+    """
+    return os.environ.get(variable, default).lower() in truthy_values
+
+
+generate_report = get_env_flag('GENERATE_REPORT', 'true')
+dump_output = get_env_flag('DUMP_OUTPUT', 'false')
+run_in_user_namespace = get_env_flag('RUN_IN_USER_NAMESPACE', 'true')
+# Generated cluster configs are validated unless explicitly turned off
+validate_cluster_config = get_env_flag('VALIDATE_CLUSTER_CONFIG', 'true')
 
 storage = RuntimeData()
 chores = Chores(workdir=workdir, storage=storage, dump_output=dump_output, generate_report=generate_report)
 # chores.perform_startup_tasks()
 
-logging_config = os.environ.get('LOGGING_CONFIG', '''
-{
-    "version": 1,
-    "disable_existing_loggers": false,
-    "formatters": {
-        "simple": {
-            "format": "%(asctime)s %(name)-12s %(levelname)-8s %(message)s"
+default_logging_config = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '%(asctime)s %(name)-12s %(levelname)-8s %(message)s'
         }
     },
-    "handlers": {
-        "stdout": {
-            "class": "logging.StreamHandler",
-            "level": "WARNING",
-            "formatter": "simple",
-            "stream": "ext://sys.stdout"
+    'handlers': {
+        'stdout': {
+            'class': 'logging.StreamHandler',
+            'level': 'WARNING',
+            'formatter': 'simple',
+            'stream': 'ext://sys.stdout'
         },
-        "stderr": {
-            "class": "logging.StreamHandler",
-            "level": "ERROR",
-            "formatter": "simple",
-            "stream": "ext://sys.stderr"
+        'stderr': {
+            'class': 'logging.StreamHandler',
+            'level': 'ERROR',
+            'formatter': 'simple',
+            'stream': 'ext://sys.stderr'
         },
-        "file": {
-            "class": "logging.FileHandler",
-            "formatter": "simple",
-            "filename": ''' + f'"{os.path.join(workdir, "kubesandbox.log")}",' + '''
-            "mode": "w"
+        'file': {
+            'class': 'logging.FileHandler',
+            'formatter': 'simple',
+            'filename': os.path.join(workdir, 'kubesandbox.log'),
+            'mode': 'w'
         },
-        "shellexec": {
-            "class": "logging.FileHandler",
-            "formatter": "simple",
-            "filename": ''' + f'"{os.path.join(workdir, "shellexec.log")}",' + '''
-            "mode": "w"
+        'shellexec': {
+            'class': 'logging.FileHandler',
+            'formatter': 'simple',
+            'filename': os.path.join(workdir, 'shellexec.log'),
+            'mode': 'w'
         }
     },
-    "loggers": {
-        "Shell": {
-            "level": "DEBUG",
-            "handlers": [
-                "shellexec"
+    'loggers': {
+        'Shell': {
+            'level': 'DEBUG',
+            'handlers': [
+                'shellexec'
             ]
         },
-        "App": {
-            "level": "DEBUG",
-            "handlers": [
-                "stderr",
-                "stdout",
-                "file"
+        'App': {
+            'level': 'DEBUG',
+            'handlers': [
+                'stderr',
+                'stdout',
+                'file'
             ]
         }
     }
-}''')
+}
 
-logging.config.dictConfig(json.loads(logging_config))
+# Overrides are given as JSON, the defaults are kept as dicts to avoid parsing them on every start.
+logging_config = json.loads(os.environ['LOGGING_CONFIG']) if 'LOGGING_CONFIG' in os.environ else default_logging_config
+
+logging.config.dictConfig(logging_config)
+logger = logging.getLogger('App.Config')
 
 
 def resource_path(relative_path):
@@ -100,27 +134,92 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-installer_config = os.environ.get('INSTALLER_CONFIG', '''
-{
-    "docker": {
-        "url": "https://get.docker.com",
-        "requires_root": true
+default_installer_config = {
+    'docker': {
+        'url': 'https://get.docker.com',
+        'requires_root': True
     },
-    "k3d": {
-        "url": "https://raw.githubusercontent.com/k3d-io/k3d/main/install.sh",
-        "requires_root": false
+    'k3d': {
+        'url': 'https://raw.githubusercontent.com/k3d-io/k3d/main/install.sh',
+        'requires_root': False
     },
-    "kubectl": {
-        "url": "https://raw.githubusercontent.com/Prakhar225/placeholder/main/kubectl.sh",
-        "requires_root": true
+    'kubectl': {
+        'url': 'https://raw.githubusercontent.com/Prakhar225/placeholder/main/kubectl.sh',
+        'requires_root': True
     },
-    "helm": {
-        "url": "https://raw.githubusercontent.com/helm/helm/main/scripts/get-helm-3",
-        "requires_root": false
+    'helm': {
+        'url': 'https://raw.githubusercontent.com/helm/helm/main/scripts/get-helm-3',
+        'requires_root': False
     }
-
 }
-''')
 
-with open(resource_path('deployment_config.json'), 'r') as f:
-    deployment_config = json.load(f)
+# A custom installer config given as JSON, parsed and validated only when a plan needs it
+installer_config = os.environ.get('INSTALLER_CONFIG')
+
+with open(resource_path('deployment_config.json'), 'rb') as f:
+    deployment_config = orjson.loads(f.read()) if orjson else json.loads(f.read())
+
+# Adapters compile their validation schema on construction, so they are built once per process.
+kube_object_list_adapter = TypeAdapter(list[KubeObject])
+
+
+@cache
+def get_installation_sources() -> dict[str, InstallationSource]:
+    """
+    Parses and validates the installer config on first use. An invalid entry is logged with its package name and
+    fails the lookup, so a typo in a package definition cannot silently drop a dependency install.
+
+    Returns:
+        A dictionary mapping package names to their installation sources.
+
+    Raises:
+        ValueError: If INSTALLER_CONFIG is not valid JSON.
+        ValidationError: If an entry of the installer config is invalid.
+    """
+    installer_config_parsed = json.loads(installer_config) if installer_config else default_installer_config
+    installation_sources = {}
+    for package, source in installer_config_parsed.items():
+        try:
+            installation_sources[package] = InstallationSource.model_validate(source)
+        except ValidationError:
+            logger.error(f'Invalid installer config for "{package}"')
+            raise
+    return installation_sources
+
+
+@cache
+def get_helm_chart(group: str, name: str) -> HelmChart:
+    """
+    Validates a Helm chart from the deployment config on first lookup.
+
+    Args:
+        group: The group of the chart in the deployment config, e.g. "ingressControllers".
+        name: The name of the chart within the group.
+
+    Returns:
+        The validated HelmChart.
+
+    Raises:
+        KeyError: If the chart is not in the deployment config.
+        ValidationError: If the chart entry is invalid.
+    """
+    return HelmChart.model_validate(deployment_config['helm'][group][name])
+
+
+@cache
+def get_kube_objects(group: str, name: str) -> list[KubeObject]:
+    """
+    Validates a list of Kubernetes objects from the deployment config on first lookup.
+
+    Args:
+        group: The group of the objects in the deployment config, e.g. "clusterManagers".
+        name: The name of the object list within the group.
+
+    Returns:
+        The validated KubeObjects.
+
+    Raises:
+        KeyError: If the object list is not in the deployment config.
+        ValidationError: If an object entry is invalid.
+    """
+    return kube_object_list_adapter.validate_python(deployment_config['kubeyaml'][group][name])
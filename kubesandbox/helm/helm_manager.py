@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Iterator
 
 from rich.pretty import pretty_repr
 
@@ -22,10 +22,34 @@ class HelmManager:
         """
         self.listed_repositories = {}
 
+    @staticmethod
+    def iter_keys(input_dict: dict, path: str = None) -> Iterator[tuple[str, Any]]:
+        """
+        Iteratively yields all leaf keys and values in a nested dictionary.
+
+        Args:
+            input_dict: The dictionary to list keys from.
+            path: An optional prefix for all generated key names.
+
+        Yields:
+            Tuples of the flattened key (dot separated path) and its value, in insertion order.
+        """
+        stack = [((path,) if path else (), iter(input_dict.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for key, value in items:
+                parts = prefix + (str(key),)
+                if isinstance(value, dict):
+                    stack.append((parts, iter(value.items())))
+                    break
+                yield '.'.join(parts), value
+            else:
+                stack.pop()
+
     @classmethod
     def list_keys(cls, input_dict: dict, path: str = None) -> dict[str, Any]:
         """
-        Recursively lists all keys and values in a nested dictionary.
+        Lists all keys and values in a nested dictionary.
 
         Args:
             input_dict: The dictionary to list keys from.
@@ -35,18 +59,7 @@ class HelmManager:
             A dictionary containing all keys and values from the input dictionary,
             with keys flattened based on their path in the nested structure.
         """
-        output = {}
-        for key, value in input_dict.items():
-            if path:
-                current_path = f'{path}.{key}'
-            else:
-                current_path = key
-
-            if isinstance(value, dict):
-                output.update(cls.list_keys(value, current_path))
-            else:
-                output[current_path] = value
-        return output
+        return dict(cls.iter_keys(input_dict, path))
 
     @classmethod
     def get_install_args(cls, helm_chart: HelmChart) -> list[str]:
@@ -63,29 +76,28 @@ class HelmManager:
 
         if helm_chart.wait:
             logger.info(f'Will wait for Helm chart "{helm_chart.chart}" to start up.')
-            install_args += ['--wait']
+            install_args.append('--wait')
 
         if helm_chart.timeout:
             logger.info(f'Helm chart installation timeout set to {helm_chart.chart}')
-            install_args += ['--timeout', f'{helm_chart.timeout}']
+            install_args.extend(('--timeout', f'{helm_chart.timeout}'))
 
         if helm_chart.repository_url:
             logger.info(f'Using repository URL "{helm_chart.repository_url}"')
-            install_args += ['--repo', helm_chart.repository_url]
+            install_args.extend(('--repo', helm_chart.repository_url))
 
         if helm_chart.namespace:
             logger.info(f'Using namespace "{helm_chart.namespace}"')
-            install_args += ['--namespace', f'{helm_chart.namespace}', '--create-namespace']
+            install_args.extend(('--namespace', f'{helm_chart.namespace}', '--create-namespace'))
 
         if helm_chart.version:
             logger.info(f'Using version "{helm_chart.version}"')
-            install_args += ['--version', f'{helm_chart.version}']
+            install_args.extend(('--version', f'{helm_chart.version}'))
 
         if helm_chart.values:
             logger.debug(f'Using values:\n {pretty_repr(helm_chart.values)}')
-            flat_values = cls.list_keys(helm_chart.values)
-            for key, value in flat_values.items():
-                install_args += ['--set', f'{key}={value}']
+            for key, value in cls.iter_keys(helm_chart.values):
+                install_args.extend(('--set', f'{key}={value}'))
 
         return install_args
 
@@ -115,10 +127,14 @@ class HelmManager:
 
         if helm_chart.display_messages:
             display_messages.update(helm_chart.display_messages.model_dump(exclude_unset=True, exclude_none=True))
+            step_display_messages = DisplayMessages.model_validate(display_messages)
+        else:
+            # Only generated messages, there is nothing to validate
+            step_display_messages = DisplayMessages.model_construct(**display_messages)
 
-        step = Step(
+        step = Step.build(
             name=f'Install {helm_chart.release_name.title()}',
-            display_messages=DisplayMessages.model_validate(display_messages),
+            display_messages=step_display_messages,
             dependencies=['helm'],
             command='helm',
             args=install_args,
@@ -1,21 +1,84 @@
 from __future__ import annotations
 
-import json
+import itertools
 import logging
 import os
-import shlex
 import time
+from functools import cache
 from typing import Any
 
-import yaml
-
 from kubesandbox import config
-from kubesandbox.k3d.model import ClusterConfig
+from kubesandbox.k3d.model import ClusterConfig, name_regex
 from kubesandbox.planner.support import Step, DisplayMessages
 from kubesandbox.storage import Resource
 
 logger = logging.getLogger('App.K3dManager')
 
+# Config filenames combine the process start time with a counter, so they are unique within and across runs
+config_filename_prefix = f'k3d-config-{int(time.time())}'
+config_filename_counter = itertools.count()
+# The application never changes its working directory, where the config files are written
+working_directory = os.getcwd()
+
+# Top level defaults of the k3d config file, used as the base of every generated config
+default_cluster_config: dict[str, Any] = ClusterConfig().model_dump(exclude_none=True)
+
+# Node filters shared by every generated config. They are never mutated, and the config dumper writes shared lists
+# out in full
+loadbalancer_node_filters = ['loadbalancer']
+first_server_node_filters = ['server:0']
+server_node_filters = ['server:*']
+all_node_filters = ['server:*', 'agent:*']
+
+# K3s arguments enabling the KubeletInUserNamespace feature gate, required for rootless docker
+user_namespace_args: tuple[dict[str, Any], ...] = tuple(
+    {'arg': f'--{component}-arg=feature-gates=KubeletInUserNamespace=true', 'nodeFilters': all_node_filters}
+    for component in ('kubelet', 'kube-controller-manager', 'kube-apiserver')
+)
+
+
+def strip_none(value: Any) -> Any:
+    """
+    Recursively removes None values from dictionaries, including dictionaries nested in lists.
+
+    Args:
+        value: The value to strip.
+
+    Returns:
+        The value without None entries.
+    """
+    if isinstance(value, dict):
+        return {key: strip_none(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [strip_none(item) for item in value]
+    return value
+
+
+@cache
+def get_config_dumper() -> type:
+    """
+    Builds the YAML dumper for k3d config files. PyYAML is only imported here, since it is not needed unless a
+    cluster is created.
+
+    Returns:
+        The dumper class, based on the libyaml emitter when available.
+    """
+    try:
+        from yaml import CSafeDumper as BaseDumper
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeDumper as BaseDumper
+
+    class ConfigDumper(BaseDumper):
+        """
+        YAML dumper for k3d config files. Node filter lists are shared between entries, so aliases are disabled to
+        keep every entry written out in full.
+        """
+
+        def ignore_aliases(self, data: Any) -> bool:
+            return True
+
+    return ConfigDumper
+
 
 class K3dManager:
     """
@@ -36,15 +99,10 @@ class K3dManager:
         """
         logger.info(f'Generating loadbalancer config for mapping {loadbalancer}')
         if loadbalancer:
+            http_port, https_port = loadbalancer
             return [
-                {
-                    'port': f'{loadbalancer[0]}:80',
-                    'nodeFilters': ['loadbalancer']
-                },
-                {
-                    'port': f'{loadbalancer[1]}:443',
-                    'nodeFilters': ['loadbalancer']
-                }
+                {'port': f'{http_port}:80', 'nodeFilters': loadbalancer_node_filters},
+                {'port': f'{https_port}:443', 'nodeFilters': loadbalancer_node_filters}
             ]
         else:
             return []
@@ -61,13 +119,8 @@ class K3dManager:
             A list of dictionaries containing nodeport mappings and node filters.
         """
         logger.info(f'Generating nodeport config for {nodeports} ports.')
-        return [
-            {
-                'port': f'{config.node_port_base}{i}',
-                'nodeFilters': ['server:0']
-            }
-            for i in range(nodeports)
-        ]
+        port_base = str(config.node_port_base)
+        return [{'port': port_base + str(i), 'nodeFilters': first_server_node_filters} for i in range(nodeports)]
 
     @classmethod
     def get_options_arg(cls, arg: str, node_filters: list) -> dict:
@@ -80,20 +133,11 @@ class K3dManager:
     def get_k3s_config(cls, use_default_ingress: bool) -> dict[str, list[Any]] | None:
         args = []
 
-        servers_only = ['server:*']
-        servers_and_agents = ['server:*', 'agent:*']
-
         if not use_default_ingress:
-            args.append(cls.get_options_arg('--disable=traefik', servers_only))
+            args.append(cls.get_options_arg('--disable=traefik', server_node_filters))
 
         if config.run_in_user_namespace:
-            args.extend([
-                cls.get_options_arg('--kubelet-arg=feature-gates=KubeletInUserNamespace=true', servers_and_agents),
-                cls.get_options_arg('--kube-controller-manager-arg=feature-gates=KubeletInUserNamespace=true',
-                                    servers_and_agents),
-                cls.get_options_arg('--kube-apiserver-arg=feature-gates=KubeletInUserNamespace=true',
-                                    servers_and_agents)
-            ])
+            args.extend(user_namespace_args)
 
         if args:
             return {'extraArgs': args}
@@ -124,9 +168,16 @@ class K3dManager:
 
         Returns:
             A Step object containing the command and parameters for creating the cluster.
+
+        Raises:
+            ValueError: If the cluster name is not a valid hostname.
         """
+        if not name_regex.fullmatch(cluster_name):
+            raise ValueError(f'Cluster name "{cluster_name}" is not a valid hostname')
+
         logger.info(f'Generating cluster config for cluster "{cluster_name}"')
         cluster_config_dict = {
+            **default_cluster_config,
             'metadata': {
                 'name': cluster_name
             }
@@ -153,30 +204,32 @@ class K3dManager:
                 'k3s': k3s_config
             }
 
-        logger.debug(f'Validating generated model:\n {cluster_config_dict}')
+        logger.debug(f'Generated cluster config:\n {cluster_config_dict}')
 
-        cluster_config = ClusterConfig.model_validate_json(json.dumps(cluster_config_dict))
+        if config.validate_cluster_config:
+            ClusterConfig.model_validate(cluster_config_dict)
 
-        config_filename = cls.write_cluster_config(cluster_config)
+        config_filename = cls.write_cluster_config(cluster_config_dict)
 
-        return Step(
+        return Step.build(
             name='Create cluster',
             dependencies=['k3d'],
             optional=False,
             command='k3d',
             args=['cluster', 'create', '--config', config_filename],
-            display_messages=DisplayMessages(
+            display_messages=DisplayMessages.model_construct(
                 ongoing_message='Creating cluster',
                 success_message='Cluster created successfully',
                 failure_message='Cluster creation failed. If you are using rootless docker, run the '
                                 '"Patch permissions for rootless docker" option from the menu then try again.'
             ),
-            on_success=Step(
+            on_success=Step.build(
                 name='merge_kube_config',
                 dependencies=['k3d'],
                 optional=False,
-                quoted_command=f'k3d kubeconfig merge {shlex.quote(cluster_name)} --kubeconfig-merge-default &> /dev/null',
-                display_messages=DisplayMessages(
+                # The name is a validated hostname, so it contains no shell special characters
+                quoted_command=f'k3d kubeconfig merge {cluster_name} --kubeconfig-merge-default &> /dev/null',
+                display_messages=DisplayMessages.model_construct(
                     ongoing_message='Updating kubeconfig',
                     success_message='Kubeconfig updated',
                     failure_message='Kubeconfig update failed'
@@ -195,29 +248,28 @@ class K3dManager:
         Returns:
             A Step object containing the command and parameters for creating the registry.
         """
-        registry_name = registry.split(':')[0]
-        registry_port = registry.split(':')[1]
+        registry_name, _, registry_port = registry.partition(':')
 
         logger.info(f'Preparing registry "{registry_name}" on port "{registry_port}"')
 
-        return Step(
+        return Step.build(
             name='check_registry_exists',
             dependencies=['docker', 'k3d', 'grep', 'kubectl'],
             quoted_command=f'[ $(k3d registry get k3d-{registry_name} --no-headers 2> /dev/null |'
                            f' grep -ic \'^k3d-{registry_name} \\+registry \\+running\') -eq 1 ]',
             optional=True,
-            display_messages=DisplayMessages(
+            display_messages=DisplayMessages.model_construct(
                 ongoing_message='Checking if the registry already exists',
                 success_message='Registry exists',
                 failure_message='Registry does not exist'
             ),
-            on_failure=Step(
+            on_failure=Step.build(
                 name='createRegistry',
                 dependencies=['docker', 'k3d'],
                 optional=False,
                 command='k3d',
                 args=['registry', 'create', '-p', f'{registry_port}', registry_name],
-                display_messages=DisplayMessages(
+                display_messages=DisplayMessages.model_construct(
                     ongoing_message='Creating registry',
                     success_message='Registry created',
                     failure_message='Registry creation failed'
@@ -226,24 +278,31 @@ class K3dManager:
         )
 
     @classmethod
-    def write_cluster_config(cls, cluster_config: ClusterConfig) -> str:
+    def write_cluster_config(cls, cluster_config: ClusterConfig | dict) -> str:
         """
         Writes the cluster configuration to a YAML file.
 
         Args:
-            cluster_config: The ClusterConfig object containing the cluster configuration.
+            cluster_config: The ClusterConfig object or a dictionary containing the cluster configuration.
 
         Returns:
             The filename of the written YAML file.
         """
-        epoch_time = int(time.time())
-        filename = f'k3d-config-{epoch_time}.yaml'
-        absolute_filename = os.path.join(os.getcwd(), filename)
+        filename = f'{config_filename_prefix}-{next(config_filename_counter)}.yaml'
+        absolute_filename = os.path.join(working_directory, filename)
 
         logger.info(f'Writing cluster config to "{absolute_filename}"')
 
-        with open(filename, 'w+') as file:
-            yaml.dump(cluster_config.model_dump(exclude_none=True), file)
+        if isinstance(cluster_config, ClusterConfig):
+            cluster_config_dict = cluster_config.model_dump(exclude_none=True, warnings=False)
+        else:
+            cluster_config_dict = strip_none(cluster_config)
+
+        import yaml
+
+        with open(filename, 'wb', buffering=65536) as file:
+            yaml.dump(cluster_config_dict, file, Dumper=get_config_dumper(), encoding='utf-8', sort_keys=False,
+                      default_flow_style=False)
 
         config.storage.resources.append(
             Resource(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from ipaddress import IPv4Address
 from typing import Any, Annotated
 
@@ -8,28 +9,31 @@ from typing_extensions import Literal
 
 name_pattern = (r'^(([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])\.)*([A-Za-z0-9]|[A-Za-z0-9][A-Za-z0-9\-]{'
                 r'0,61}[A-Za-z0-9])$')
+name_regex = re.compile(name_pattern)
+# Hostname type shared by every field constrained to the name pattern
+Hostname = Annotated[str, StringConstraints(pattern=name_pattern)]
 node_filter_example = ['loadbalancer', 'server:*', 'server:0', 'agent:1', 'all']
 
 
 class Metadata(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
-    name: Annotated[str, StringConstraints(pattern=name_pattern)] | None = None
+    name: Hostname | None = None
     """
     Name of the cluster (must be a valid hostname and will be prefixed with 'k3d-'). Example: 'mycluster'.
     """
 
 
 class KubeAPI(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
-    host: Annotated[str, StringConstraints(pattern=name_pattern)] | None = None
+    host: Hostname | None = None
     hostIP: IPv4Address | None = Field(None, examples=['0.0.0.0', '192.168.178.55'])
     hostPort: str | None = Field(None, examples=['6443'])
 
 
 class Loadbalancer(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     configOverrides: list | None = Field(
         None,
@@ -41,7 +45,7 @@ class Loadbalancer(BaseModel):
 
 
 class K3dConfig(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     wait: bool | None = True
     timeout: Any | None = Field(None, examples=['60s', '1m', '1m30s'])
@@ -52,14 +56,14 @@ class K3dConfig(BaseModel):
 
 
 class Kubeconfig(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     updateDefaultKubeconfig: bool | None = True
     switchCurrentContext: bool | None = True
 
 
 class Proxy(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     remoteURL: str | None = Field(None, examples=['https://registry-1.docker.io'])
     username: str | None = None
@@ -71,7 +75,7 @@ class Create(BaseModel):
     Create a new container image registry alongside the cluster.
     """
 
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     name: str | None = Field(None, examples=['myregistry', 'registry.localhost'])
     host: str | None = Field('0.0.0.0', examples=['0.0.0.0', 'localhost', '127.0.0.1'])
@@ -86,6 +90,8 @@ class Create(BaseModel):
 
 
 class Registries(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     create: Create | None = None
     """
     Create a new container image registry alongside the cluster.
@@ -102,12 +108,14 @@ class Registries(BaseModel):
 
 
 class HostAliase(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     ip: str | None = None
     hostnames: list[str] | None = None
 
 
 class Volume(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     volume: str | None = None
     nodeFilters: list[str] | None = Field(
@@ -116,7 +124,7 @@ class Volume(BaseModel):
 
 
 class Port(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     port: str | None = None
     nodeFilters: list[str] | None = Field(
@@ -125,7 +133,7 @@ class Port(BaseModel):
 
 
 class ExtraArg(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     arg: str | None = Field(None, examples=['--tls-san=127.0.0.1', '--disable=traefik'])
     nodeFilters: list[str] | None = Field(
@@ -134,7 +142,7 @@ class ExtraArg(BaseModel):
 
 
 class NodeLabel(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     label: str | None = None
     nodeFilters: list[str] | None = Field(
@@ -143,7 +151,7 @@ class NodeLabel(BaseModel):
 
 
 class K3sConfig(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     extraArgs: list[ExtraArg] | None = None
     nodeLabels: list[NodeLabel] | None = None
@@ -154,6 +162,8 @@ class Label(NodeLabel):
 
 
 class Runtime(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     gpuRequest: str | None = None
     serversMemory: str | None = None
     agentsMemory: str | None = None
@@ -162,7 +172,7 @@ class Runtime(BaseModel):
 
 
 class Options(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     k3d: K3dConfig | None = None
     k3s: K3sConfig | None = None
@@ -171,7 +181,7 @@ class Options(BaseModel):
 
 
 class EnvItem(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     envVar: str | None = None
     nodeFilters: list[str] | None = Field(
@@ -180,13 +190,13 @@ class EnvItem(BaseModel):
 
 
 class ClusterConfig(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     apiVersion: Literal['k3d.io/v1alpha4'] | None = 'k3d.io/v1alpha4'
     kind: Literal['Simple'] | None = 'Simple'
     metadata: Metadata | None = Metadata(name='sandbox')
     servers: Annotated[int, Field(strict=True, ge=1)] | None = 1
-    agents: Annotated[int, Field(strict=True, gt=0)] | None = 0
+    agents: Annotated[int, Field(strict=True, ge=0)] | None = 0
     kubeAPI: KubeAPI | None = None
     image: str | None = Field(None, examples=['rancher/k3s:latest'])
     network: str | None = None
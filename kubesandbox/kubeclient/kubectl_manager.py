@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import logging
-import os
-import uuid
 from typing import Literal
 
-from kubesandbox import config
 from kubesandbox.kubeclient.model import KubeObject
 from kubesandbox.planner.support import Step, DisplayMessages
 
 logger = logging.getLogger("App.KubeManager")
 
+# Ongoing, success and failure verbs used in the display messages of each kubectl action.
+action_verbs: dict[str, tuple[str, str, str]] = {
+    'apply': ('Deploying', 'Deployed', 'Failed to deploy'),
+    'delete': ('Deleting', 'Deleted', 'Failed to delete')
+}
+
 
 class KubeManager:
     """
@@ -34,34 +37,70 @@ class KubeManager:
         apply_steps = []
         delete_steps = []
 
-        for kube_object in kube_objects:
-            if kube_object.yaml_content:
-                yaml_file = cls.write_content_to_file(kube_object)
-                kube_object.yaml_file = yaml_file
-                config.storage.temp_files.append(yaml_file)
+        for kube_object in cls.batch_kube_objects(kube_objects):
+            # Inline content is piped to kubectl instead of being written to a temporary file
+            yaml_file = '-' if kube_object.yaml_content else kube_object.yaml_file
 
-            apply_steps.append(cls.kube_object_to_step('apply', kube_object.yaml_file, kube_object))
-            delete_steps.append(cls.kube_object_to_step('delete', kube_object.yaml_file, kube_object))
+            apply_steps.append(cls.kube_object_to_step('apply', yaml_file, kube_object))
+            delete_steps.append(cls.kube_object_to_step('delete', yaml_file, kube_object))
 
         return cls.merge_steps(apply_steps, delete_steps)
 
     @classmethod
-    def write_content_to_file(cls, kube_object: KubeObject) -> str:
+    def batch_kube_objects(cls, kube_objects: list[KubeObject]) -> list[KubeObject]:
+        """
+        Combines consecutive objects with inline YAML content in the same namespace into a single object, so that
+        they are applied with one kubectl invocation. Objects referencing a YAML file are kept as they are, since
+        they are often installers registering resource definitions that the following objects depend on.
+
+        Args:
+            kube_objects: A list of KubeObject instances in the order they should be applied.
+
+        Returns:
+            A list of KubeObject instances, each representing one kubectl invocation.
+        """
+        batches: list[list[KubeObject]] = []
+
+        for kube_object in kube_objects:
+            if (kube_object.yaml_content and batches and batches[-1][-1].yaml_content
+                    and batches[-1][-1].namespace == kube_object.namespace):
+                batches[-1].append(kube_object)
+            else:
+                batches.append([kube_object])
+
+        return [batch[0] if len(batch) == 1 else cls.merge_kube_objects(batch) for batch in batches]
+
+    @classmethod
+    def merge_kube_objects(cls, kube_objects: list[KubeObject]) -> KubeObject:
         """
-        Writes the YAML content of a Kubernetes object to a temporary file.
+        Merges Kubernetes objects with inline YAML content into a single multi-document object.
 
         Args:
-            kube_object: The KubeObject instance containing the YAML content.
+            kube_objects: A list of KubeObject instances sharing the same namespace.
 
         Returns:
-            The filename of the written YAML file.
+            A KubeObject whose YAML content contains all the given objects.
         """
-        logger.info(f'writing content for {kube_object.name}({kube_object.kind}) to yaml file')
-        filename = os.path.join(config.workdir, f'{uuid.uuid4()}.yaml')
-        with open(filename, 'w') as f:
-            f.write(kube_object.yaml_content)
-        logger.info(f'Generated yaml file: {filename}')
-        return filename
+        display_messages = {}
+        for kube_object in kube_objects:
+            if kube_object.display_messages:
+                for key, value in kube_object.display_messages.model_dump(exclude_none=True).items():
+                    if value not in display_messages.get(key, []):
+                        display_messages.setdefault(key, []).append(value)
+
+        kinds = list(dict.fromkeys(kube_object.kind or 'resources' for kube_object in kube_objects))
+
+        # The merged object is built from validated objects and always has YAML content, so validation is skipped
+        return KubeObject.model_construct(
+            name=', '.join(kube_object.name for kube_object in kube_objects),
+            kind=', '.join(kinds),
+            yaml_content='\n---\n'.join(kube_object.yaml_content for kube_object in kube_objects),
+            namespace=kube_objects[0].namespace,
+            display_messages=DisplayMessages.model_validate(
+                {key: '\n\n'.join(values) for key, values in display_messages.items()}
+            ) if display_messages else None,
+            resources=[resource for kube_object in kube_objects for resource in kube_object.resources]
+        )
 
     @classmethod
     def kube_object_to_step(cls,
@@ -73,7 +112,8 @@ class KubeManager:
 
         Args:
             action: The kubectl action to perform, either 'apply' or 'delete'.
-            yaml_file: The filename of the YAML file containing the Kubernetes object definition.
+            yaml_file: The filename of the YAML file containing the Kubernetes object definition, or '-' to pass the
+                YAML content of the object through the standard input.
             kube_object: The KubeObject instance representing the Kubernetes object.
 
         Returns:
@@ -87,33 +127,33 @@ class KubeManager:
 
         logger.debug(f'Kubectl args: {args}')
 
-        display_messages: dict
+        kind = kube_object.kind or 'resources'
+        name = kube_object.name.title()
+        ongoing_verb, success_verb, failure_verb = action_verbs[action]
 
-        if action == 'apply':
-            display_messages = {
-                'ongoing_message': f'Deploying {kube_object.kind or "resources"} for {kube_object.name.title()}',
-                'success_message': f'Deployed {kube_object.kind or "resources"} for {kube_object.name.title()}',
-                'failure_message': f'Failed to deploy {kube_object.kind or "resources"} for {kube_object.name.title()}'
-            }
-        else:
-            display_messages = {
-                'ongoing_message': f'Deleting {kube_object.kind or "resources"} for {kube_object.name.title()}',
-                'success_message': f'Deleted {kube_object.kind or "resources"} for {kube_object.name.title()}',
-                'failure_message': f'Failed to delete {kube_object.kind or "resources"} for {kube_object.name.title()}'
-            }
+        display_messages = {
+            'ongoing_message': f'{ongoing_verb} {kind} for {name}',
+            'success_message': f'{success_verb} {kind} for {name}',
+            'failure_message': f'{failure_verb} {kind} for {name}'
+        }
 
         if kube_object.display_messages:
             display_messages.update(kube_object.display_messages.model_dump(exclude_unset=True, exclude_none=True))
+            step_display_messages = DisplayMessages.model_validate(display_messages)
+        else:
+            # Only generated messages, there is nothing to validate
+            step_display_messages = DisplayMessages.model_construct(**display_messages)
 
         logger.debug(f'Display messages: {display_messages}')
 
-        return Step(
-            name=f'{action.title()} {kube_object.kind or "resources"} for {kube_object.name.title()}',
+        return Step.build(
+            name=f'{action.title()} {kind} for {name}',
             dependencies=['kubectl'],
             optional=True,
             command='kubectl',
             args=args,
-            display_messages=DisplayMessages.model_validate(display_messages),
+            stdin=kube_object.yaml_content if yaml_file == '-' else None,
+            display_messages=step_display_messages,
             resources=kube_object.resources
         )
 
@@ -129,11 +169,10 @@ class KubeManager:
         Returns:
             The first Step object in the merged chain.
         """
-        for reverse_index in range(len(delete_steps) - 1, 0, -1):
-            delete_steps[reverse_index].on_success = delete_steps[reverse_index - 1]
-
-        for index in range(len(apply_steps) - 1):
-            apply_steps[index].on_success = apply_steps[index + 1]
-            apply_steps[index + 1].on_failure = delete_steps[index + 1].on_success
+        for apply_step, next_apply_step, delete_step, next_delete_step in zip(
+                apply_steps, apply_steps[1:], delete_steps, delete_steps[1:]):
+            next_delete_step.on_success = delete_step
+            apply_step.on_success = next_apply_step
+            next_apply_step.on_failure = next_delete_step.on_success
 
         return apply_steps[0]
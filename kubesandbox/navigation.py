@@ -1,23 +1,43 @@
+from functools import cache
+
 import questionary
 from questionary import Separator, Choice, Style
 
 from kubesandbox import config
 
-custom_style_fancy = Style([
-    ('qmark', 'fg:#673ab7'),  # token in front of the question
-    ('question', 'bold italic underline fg:#3d69ad  '),  # question text
-    ('answer', 'fg:#f44336 bold'),  # submitted answer text behind the question
-    ('pointer', 'fg:#21aa08  bold'),  # pointer used in select and checkbox prompts
-    ('highlighted', 'fg:#21aa08  bold'),  # pointed-at choice in select and checkbox prompts
-    ('selected', 'fg:#cc5454'),  # style for a selected item of a checkbox
-    # ('separator', 'fg:#cc5454'),  # separator in lists
-    ('instruction', ''),  # user instructions for select, rawselect, checkbox
-    ('text', ''),  # plain text
-    ('disabled', 'fg:#858585 italic')  # disabled choices for select and checkbox prompts
-])
+
+@cache
+def get_custom_style_fancy() -> Style:
+    """
+    Builds the style of the menus once, on first use.
+
+    Returns:
+        The questionary style for the menus.
+    """
+    return Style([
+        ('qmark', 'fg:#673ab7'),  # token in front of the question
+        ('question', 'bold italic underline fg:#3d69ad  '),  # question text
+        ('answer', 'fg:#f44336 bold'),  # submitted answer text behind the question
+        ('pointer', 'fg:#21aa08  bold'),  # pointer used in select and checkbox prompts
+        ('highlighted', 'fg:#21aa08  bold'),  # pointed-at choice in select and checkbox prompts
+        ('selected', 'fg:#cc5454'),  # style for a selected item of a checkbox
+        # ('separator', 'fg:#cc5454'),  # separator in lists
+        ('instruction', ''),  # user instructions for select, rawselect, checkbox
+        ('text', ''),  # plain text
+        ('disabled', 'fg:#858585 italic')  # disabled choices for select and checkbox prompts
+    ])
 
 
 class InputMenus:
+    direct_mapping_choice: str = ("Direct mapping (maps port 80:80 and 443:443 to allow URLs like "
+                                  "'http://rancher.localhost' but requires root access)")
+    indirect_mapping_choice: str = "Indirect mapping (maps port 80 to 8080 and 443 to 4433)"
+    no_mapping_choice: str = "No load balancer mapping"
+    loadbalancer_mappings: dict[str, tuple[int, int] | None] = {
+        direct_mapping_choice: (80, 443),
+        indirect_mapping_choice: (8080, 4433),
+        no_mapping_choice: None
+    }
     basic_build_menu: list[dict] = [
         {
             "type": "print",
@@ -43,14 +63,12 @@ class InputMenus:
             "message": "Select a load balancer mapping. [One of the ways to access the cluster. Required for "
                        "ingresses.]",
             "choices": [
-                "Direct mapping (maps port 80:80 and 443:443 to allow URLs like 'http://rancher.localhost' but "
-                "requires root access)",
-                "Indirect mapping (maps port 80 to 8080 and 443 to 4433)",
+                direct_mapping_choice,
+                indirect_mapping_choice,
                 Separator(),
-                "No load balancer mapping"
+                no_mapping_choice
             ],
-            "default": "Direct mapping (maps port 80:80 and 443:443 to allow URLs like 'http://rancher.localhost' but "
-                       "requires root access)"
+            "default": direct_mapping_choice
         },
         {
             "type": "text",
@@ -95,6 +113,7 @@ class InputMenus:
         Separator(),
         Choice(title='Exit', value='exit'),
     ]
+    main_menu_prompt: str = f'{config.intro}Select an option to continue:'
     main_menu_meta: dict[str, str] = {
         'Build cluster using configuration file': 'Mike testing hello'
     }
@@ -106,9 +125,9 @@ class InputMenus:
 
     @classmethod
     def get_main_menu(cls) -> str:
-        return questionary.select(message=f'{config.intro}Select an option to continue:', choices=cls.main_menu,
+        return questionary.select(message=cls.main_menu_prompt, choices=cls.main_menu,
                                   qmark=' ',
-                                  style=custom_style_fancy).ask()
+                                  style=get_custom_style_fancy()).ask()
 
     @classmethod
     def parse_description(cls, description):
@@ -120,12 +139,7 @@ class InputMenus:
 
         inputs.ingress = description['ingress'].lower() if description['ingress'] != 'No ingress controller' else None
 
-        if f"{description['loadbalancer']}".startswith('Direct'):
-            inputs.loadbalancer = (80, 443)
-        elif f"{description['loadbalancer']}".startswith('Indirect'):
-            inputs.loadbalancer = (8080, 4433)
-        else:
-            inputs.loadbalancer = None
+        inputs.loadbalancer = cls.loadbalancer_mappings.get(description['loadbalancer'])
 
         inputs.management_tool = description['management'].lower()
 
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import logging
 import os
+import sys
 from typing import Literal
 
 from pydantic import BaseModel
 from rich.align import Align
 from rich.console import ConsoleRenderable, RichCast, Group
+from rich.emoji import Emoji
 from rich.layout import Layout
 from rich.live import Live
 from rich.markdown import Markdown
@@ -17,6 +19,30 @@ from rich.text import Text
 
 logger = logging.getLogger('App.RichDisplay')
 
+# Number of most recent items kept in the logs panel. Older items would be cropped out of the panel anyway, but still
+# cost memory and layout time on every refresh
+max_log_items = 200
+
+# Prefix, prefix style and text style of each single line log item. The items are assembled from styled parts, so the
+# markup parser does not run for every log line, and markup-like text in log messages is shown as is
+log_item_parts: dict[str, tuple[str, str, str]] = {
+    'success': (Emoji.replace(':white_check_mark: '), 'green', 'green'),
+    'warning': (Emoji.replace(' :bangbang: '), 'bold bright_yellow', 'bright_yellow'),
+    'error': (Emoji.replace(':cross_mark: '), 'bright_red', 'bright_red'),
+}
+
+
+def clear_screen():
+    """
+    Clears the terminal and its scrollback. On POSIX terminals the escape codes printed by `clear` are written
+    directly, instead of starting a shell and the `clear` program.
+    """
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        sys.stdout.write('\x1b[H\x1b[2J\x1b[3J')
+        sys.stdout.flush()
+
 
 class PanelTheme(BaseModel):
     """
@@ -116,9 +142,13 @@ class RichDisplay:
         self.title_text: str = title
         self.layout: Layout = layout
         self.last_added_item: str | ConsoleRenderable | RichCast = ''
-        self.live = Live(renderable=layout, refresh_per_second=60)
+        # The display only changes when a step starts or ends, so a low refresh rate is enough and leaves the CPU to
+        # the executed commands
+        self.live = Live(renderable=layout, refresh_per_second=12)
 
         self.logs_content = Group()
+        # A single status is reused for every loading item, as creating one also creates its own spinner and Live
+        self.loading_status = Status('', spinner=self.theme.spinner)
         self.progress = Progress()
 
         self.header_panel = self.get_standard_panel(self.title_text, self.theme.header_panel)
@@ -158,7 +188,7 @@ class RichDisplay:
         Starts the live display.
         """
         if not self.running:
-            os.system('clear')
+            clear_screen()
             self.live.start()
             self.running = True
 
@@ -168,7 +198,7 @@ class RichDisplay:
         """
         if self.running:
             self.live.stop()
-            os.system('clear')
+            clear_screen()
             self.running = False
 
     def push_to_logs(self, item: ConsoleRenderable | RichCast | str):
@@ -182,9 +212,12 @@ class RichDisplay:
             logger.info('Stopping status loader')
             self.logs_content.renderables.pop()
 
-        logger.info(f'Adding item {item}')
+        logger.info('Adding item %s', item)
         self.last_added_item = item
-        self.logs_content.renderables.append(item)
+        renderables = self.logs_content.renderables
+        renderables.append(item)
+        if len(renderables) > max_log_items:
+            del renderables[:len(renderables) - max_log_items]
 
     def advance_progress_bar(self, task_id: int, advance_by: int):
         """
@@ -194,7 +227,7 @@ class RichDisplay:
             task_id: The ID of the progress bar to advance.
             advance_by: The amount to advance the progress bar by.
         """
-        logger.debug(f'Advancing progress bar {task_id} by {advance_by}')
+        logger.debug('Advancing progress bar %s by %s', task_id, advance_by)
         self.progress.advance(TaskID(task_id), advance=advance_by)
 
     def add_progress_bar(self, title: str, total: int) -> int:
@@ -208,7 +241,7 @@ class RichDisplay:
         Returns:
             The ID of the newly added progress bar.
         """
-        logger.debug(f'Adding progress bar {title} with total {total}')
+        logger.debug('Adding progress bar %s with total %s', title, total)
         task_id = self.progress.add_task(title, total=total)
         return int(task_id)
 
@@ -221,15 +254,13 @@ class RichDisplay:
             item_type: The type of item to add.
         """
         if item_type == 'loading':
-            item = Status(Text.from_markup(f'[bold navy_blue]{text}[/]'), spinner=self.theme.spinner)
-        elif item_type == 'success':
-            item = Text.from_markup(text=f'[green]:white_check_mark: {text}[/]', justify='left')
-        elif item_type == 'warning':
-            item = Text.from_markup(text=f'[bright_yellow][bold] :bangbang: [/bold]{text}[/]', justify='left')
-        elif item_type == 'error':
-            item = Text.from_markup(text=f'[bright_red]:cross_mark: {text}[/]', justify='left')
+            self.loading_status.update(Text(text, style='bold navy_blue'))
+            item = self.loading_status
         elif item_type == 'heading':
-            item = Text.from_markup(text=f'[underline]\n{text}[/]\n', style='bold black', justify='center')
+            item = Text.assemble(('\n' + text, 'underline'), '\n', style='bold black', justify='center')
+        else:
+            prefix, prefix_style, text_style = log_item_parts[item_type]
+            item = Text.assemble((prefix, prefix_style), (text, text_style), justify='left')
 
         self.push_to_logs(item)
 
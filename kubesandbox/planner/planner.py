@@ -1,7 +1,11 @@
+import hashlib
+import json
 import logging
-import shlex
+import os
 import shutil
-import traceback
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 
 import httpx
@@ -16,6 +20,9 @@ from kubesandbox.storage import CommandOutput, ReportNote
 
 logger = logging.getLogger('App.Planner')
 
+# Upper bound on the number of installation scripts downloaded at the same time
+max_parallel_downloads = 8
+
 
 class ExecutionPlanner:
     """
@@ -24,25 +31,152 @@ class ExecutionPlanner:
     Attributes:
         steps: A list of Step objects representing the plan.
         installation_sources: A dictionary mapping package names to their installation sources.
-        _shell: An instance of the Shell class for executing commands.
-        _display: An instance of the RichDisplay class for displaying information.
+        _shell: An instance of the Shell class for executing commands. A new Shell is created if none is given.
+        _display: An instance of the RichDisplay class for displaying information. A new RichDisplay is created if
+            none is given.
         progress_id: The ID of the progress bar in the display.
         current_step_total_effort: The total effort required for the current step.
         current_step_spent_effort: The effort spent on the current step.
+        _http_client: An HTTP client shared by all script downloads, created on first use.
+        _http_client_lock: A lock ensuring that download threads create only one HTTP client.
+        _display_lock: A lock serializing display updates made from download threads.
+        _installation_scripts: Installation scripts downloaded ahead of their installation, by package name.
     """
 
-    def __init__(self, steps: list[Step], installation_sources: dict[str, InstallationSource] = {}):
+    def __init__(self, steps: list[Step], installation_sources: dict[str, InstallationSource] = {},
+                 shell: Shell | None = None, display: RichDisplay | None = None):
         self.steps: list[Step] = steps
-        self._shell: Shell = Shell()
-        self._display: RichDisplay = RichDisplay('KubeSandbox')
+        self._shell: Shell = shell if shell is not None else Shell()
+        self._display: RichDisplay = display if display is not None else RichDisplay('KubeSandbox')
         self.installation_sources: dict[str, InstallationSource] = installation_sources
         self.progress_id: int = 0
         self.current_step_total_effort: int = 0
         self.current_step_spent_effort: int = 0
+        self._http_client: httpx.Client | None = None
+        self._http_client_lock: threading.Lock = threading.Lock()
+        self._display_lock: threading.Lock = threading.Lock()
+        self._installation_scripts: dict[str, str] = {}
+
+    def __get_http_client(self) -> httpx.Client:
+        """
+        Gets the HTTP client used for downloading installation scripts. The client keeps connections alive, so
+        scripts hosted on the same server are downloaded over a single connection. Parallel downloads share the
+        client, so it is created under a lock.
+
+        Returns:
+            The shared HTTP client.
+        """
+        with self._http_client_lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client()
+            return self._http_client
+
+    def __close_http_client(self):
+        """
+        Closes the HTTP client, if one was created.
+        """
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    @staticmethod
+    def __get_script_cache_files(source: InstallationSource) -> tuple[str, str]:
+        """
+        Gets the cache files of an installation script, keyed by the URL and request parameters of its source.
+
+        Args:
+            source: The installation source of the script.
+
+        Returns:
+            The paths of the cached script and of its metadata file.
+        """
+        key = hashlib.sha1(json.dumps([source.url, source.request_params], sort_keys=True).encode()).hexdigest()
+        cache_file = os.path.join(config.script_cache_dir, key)
+        return f'{cache_file}.sh', f'{cache_file}.meta.json'
+
+    @staticmethod
+    def __read_script_cache(script_file: str, meta_file: str) -> tuple[str | None, dict[str, str]]:
+        """
+        Reads a cached installation script and builds the conditional request headers for revalidating it. The script
+        is only used if it matches the digest stored in its metadata file, otherwise it is downloaded unconditionally.
+
+        Args:
+            script_file: The path of the cached script.
+            meta_file: The path of the metadata file of the cached script.
+
+        Returns:
+            The cached script and the conditional request headers, or None and no headers if there is no usable
+            cached script.
+        """
+        try:
+            with open(meta_file, 'rb') as file:
+                meta = json.loads(file.read())
+            with open(script_file, 'r') as file:
+                script = file.read()
+        except (OSError, ValueError):
+            return None, {}
+
+        if meta.get('sha256') != hashlib.sha256(script.encode()).hexdigest():
+            logger.info(f'Ignoring cached script "{script_file}", which does not match its metadata')
+            return None, {}
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return script, headers
+
+    @staticmethod
+    def __replace_file(filename: str, content: str):
+        """
+        Writes content to a temporary file next to the target and moves it into place, so readers never see a
+        partially written file.
+
+        Args:
+            filename: The path of the file to write.
+            content: The content to write.
+
+        Raises:
+            OSError: If the file could not be written.
+        """
+        fd, temp_filename = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(content)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            os.unlink(temp_filename)
+            raise
+
+    @staticmethod
+    def __write_script_cache(script_file: str, meta_file: str, response: httpx.Response):
+        """
+        Caches a downloaded installation script if the server sent validators that allow revalidating it later.
+        Failures to write the cache are logged and otherwise ignored.
+
+        Args:
+            script_file: The path of the cached script.
+            meta_file: The path of the metadata file of the cached script.
+            response: The response containing the script.
+        """
+        meta = {'etag': response.headers.get('etag'), 'last_modified': response.headers.get('last-modified')}
+        if not any(meta.values()):
+            return
+        meta['sha256'] = hashlib.sha256(response.text.encode()).hexdigest()
+
+        try:
+            os.makedirs(config.script_cache_dir, exist_ok=True)
+            # The metadata is written last, so it never refers to a script that is not fully cached
+            ExecutionPlanner.__replace_file(script_file, response.text)
+            ExecutionPlanner.__replace_file(meta_file, json.dumps(meta))
+        except OSError:
+            logger.info(f'Could not cache script "{script_file}"', exc_info=True)
 
     def __download_package_installation_script(self, package: str) -> str:
         """
-        Downloads the installation script for a package from its source.
+        Downloads the installation script for a package from its source. Scripts are cached on disk and only
+        downloaded again when the server reports a change.
 
         Args:
             package: The name of the package.
@@ -53,23 +187,54 @@ class ExecutionPlanner:
         Raises:
             InstallationFailedException: If the script download fails.
         """
-        logger.info(
-            f'Downloading script for package "{package}" from "{self.installation_sources[package].url}"')
-
-        response = httpx.get(
-            url=self.installation_sources[package].url,
-            params=self.installation_sources[package].request_params,
-            headers=self.installation_sources[package].request_headers
+        source = self.installation_sources[package]
+        logger.info(f'Downloading script for package "{package}" from "{source.url}"')
+
+        script_file, meta_file = self.__get_script_cache_files(source)
+        cached_script, cache_validators = self.__read_script_cache(script_file, meta_file)
+        response = self.__get_http_client().get(
+            url=source.url,
+            params=source.request_params,
+            headers={**(source.request_headers or {}), **cache_validators}
         )
-        logger.debug(f'Headers - {response.headers}\nStatus code - {response.status_code}\n'
-                     f'Text - {response.text[0:100]}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Headers - {response.headers}\nStatus code - {response.status_code}\n'
+                         f'Text - {response.text[0:100]}')
+
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached_script is not None:
+            logger.info(f'Using cached script for package "{package}"')
+            return cached_script
 
         if 300 <= response.status_code or response.status_code < 200:
-            self._display.add_item_to_logs(f'Failed to download script for {package}', item_type='error')
+            with self._display_lock:
+                self._display.add_item_to_logs(f'Failed to download script for {package}', item_type='error')
             raise InstallationFailedException(f'Failed to download script for package "{package}"')
 
+        self.__write_script_cache(script_file, meta_file, response)
         return response.text
 
+    def __download_package_installation_scripts(self, packages: list[str]):
+        """
+        Downloads the installation scripts of several packages concurrently, so that the downloads overlap instead of
+        waiting on each other. Packages without an installation source are skipped.
+
+        Args:
+            packages: The names of the packages.
+
+        Raises:
+            InstallationFailedException: If a script download fails.
+        """
+        packages = [package for package in packages if package in self.installation_sources]
+        if not packages:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_parallel_downloads, len(packages))) as executor:
+            downloads = {package: executor.submit(self.__download_package_installation_script, package)
+                         for package in packages}
+
+        for package, download in downloads.items():
+            self._installation_scripts[package] = download.result()
+
     def __execute_package_installation_script(self, package: str, installation_script: str):
         """
         Executes the installation script for a package.
@@ -81,7 +246,9 @@ class ExecutionPlanner:
         Raises:
             InstallationFailedException: If the script execution fails.
         """
-        result = self._shell.execute_command(direct_command=f'bash -c {shlex.quote(installation_script)}')
+        # The script is piped to bash instead of being quoted into the command line, which keeps large scripts
+        # clear of the argument size limit
+        result = self._shell.execute_command(command=['bash', '-s'], stdin=installation_script)
         if result.exit_code != 0:
             logger.info('Installation failed')
             self._display.add_item_to_logs('Installation failed', item_type='error')
@@ -108,10 +275,11 @@ class ExecutionPlanner:
             raise UnknownPackageException(f'No installation source available for the package {package}')
 
         logger.info(f'Installing package {package}')
-        self._display.add_item_to_logs(f'Downloading installation script for package {package}',
-                                       item_type='loading')
-
-        installation_script = self.__download_package_installation_script(package)
+        installation_script = self._installation_scripts.pop(package, None)
+        if installation_script is None:
+            self._display.add_item_to_logs(f'Downloading installation script for package {package}',
+                                           item_type='loading')
+            installation_script = self.__download_package_installation_script(package)
 
         self._display.add_item_to_logs(f'Installing {package}', item_type='loading')
 
@@ -141,13 +309,19 @@ class ExecutionPlanner:
         self._display.start()
 
         self._display.add_item_to_logs('Installing packages', item_type='heading')
-        for package in packages:
-            try:
+        try:
+            # Scripts are downloaded in parallel, but installed one at a time as they share the system state
+            self._display.add_item_to_logs('Downloading installation scripts', item_type='loading')
+            self.__download_package_installation_scripts(list(packages))
+            for package in packages:
                 self.__install_package(package)
-            except Exception as e:
-                self._display.add_item_to_logs(traceback.format_exc(), item_type='error')
-                self._display.stop()
-                raise e
+        except Exception as e:
+            # The display gets a one line summary, the full traceback only goes to the log file. It is logged below the
+            # console handler levels so that it does not break the live display
+            logger.info('Package installation failed', exc_info=True)
+            self._display.add_item_to_logs(f'{type(e).__name__}: {e}', item_type='error')
+            self._display.stop()
+            raise e
 
     def __get_missing_dependencies(self) -> set[str]:
         """
@@ -156,16 +330,19 @@ class ExecutionPlanner:
         Returns:
             A set of missing dependencies.
         """
-        dependencies = set()
+        # Steps share most of their dependencies, so each one is looked up on the PATH only once
+        installed: dict[str, bool] = {}
         for step in self.steps:
             for dependency in step.dependencies:
-                if not shutil.which(dependency):
-                    dependencies.add(dependency)
-        return dependencies
+                if dependency not in installed:
+                    installed[dependency] = shutil.which(dependency) is not None
+        return {dependency for dependency, is_installed in installed.items() if not is_installed}
 
     def __get_step_effort(self, step: Step) -> int:
         """
-        Calculates the total effort required for a step and its sub-steps.
+        Calculates the total effort required for a step and its sub-steps, storing the effort of every step in the
+        tree on the step itself. The tree is walked in post-order with an explicit stack, so long callback chains do
+        not recurse.
 
         Args:
             step: The Step object.
@@ -173,16 +350,17 @@ class ExecutionPlanner:
         Returns:
             The total effort required for the step.
         """
-        effort = 1
-
-        if step.on_success:
-            effort += self.__get_step_effort(step.on_success)
-
-        if step.on_failure:
-            effort += self.__get_step_effort(step.on_failure)
-
-        step.execution_effort = effort
-        return effort
+        stack: list[tuple[Step, bool]] = [(step, False)]
+        while stack:
+            current, children_done = stack.pop()
+            if children_done:
+                current.execution_effort = 1 + sum(child.execution_effort for child in
+                                                   (current.on_success, current.on_failure) if child)
+            else:
+                stack.append((current, True))
+                stack.extend((child, False) for child in (current.on_success, current.on_failure) if child)
+
+        return step.execution_effort
 
     def __get_plan_effort(self) -> int:
         """
@@ -209,7 +387,10 @@ class ExecutionPlanner:
 
         if dependencies:
             logger.info(f'Missing dependencies: {dependencies}')
-            self.__install_packages(dependencies)
+            try:
+                self.__install_packages(dependencies)
+            finally:
+                self.__close_http_client()
         else:
             logger.info('No missing dependencies found')
             self._display.start()
@@ -218,9 +399,9 @@ class ExecutionPlanner:
 
         for step in self.steps:
             self.current_step_total_effort = step.execution_effort
-            logger.debug(f'Effort required for the step "{step.name}": {self.current_step_total_effort}')
+            logger.debug('Effort required for the step "%s": %s', step.name, self.current_step_total_effort)
             self.__execute_step(step)
-            logger.debug(f'Effort spent on the step "{step.name}": {self.current_step_spent_effort}')
+            logger.debug('Effort spent on the step "%s": %s', step.name, self.current_step_spent_effort)
             self.__rectify_progress()
 
         self._display.stop()
@@ -240,14 +421,15 @@ class ExecutionPlanner:
 
         if step.command:
             command = [step.command] + step.args
-            result = self._shell.execute_command(command=command)
+            result = self._shell.execute_command(command=command, stdin=step.stdin)
         elif step.quoted_command:
             result = self._shell.execute_command(direct_command=step.quoted_command)
 
         self._display.advance_progress_bar(self.progress_id, 1)
         self.current_step_spent_effort += 1
 
-        config.storage.outputs.append(CommandOutput(
+        # The values come straight from the shell, so validation is skipped
+        config.storage.outputs.append(CommandOutput.model_construct(
             title=step.name,
             stdout=result.stdout,
             stderr=result.stderr,
@@ -319,7 +501,7 @@ class ExecutionPlanner:
             step: The Step object to be executed.
             step_type: The type of step, either 'parent', 'success_child', or 'failure_child'.
         """
-        logger.info(f'Executing step {step_type} "{step.name}"')
+        logger.info('Executing step %s "%s"', step_type, step.name)
         if step_type == 'parent':
             self._display.add_item_to_logs(step.name.title(), item_type='heading')
 
@@ -334,7 +516,7 @@ class ExecutionPlanner:
         Rectifies the progress bar if the effort spent on the current step is less than the total effort required.
         """
         if self.current_step_total_effort > self.current_step_spent_effort:
-            logger.debug(f'Rectifying progress by {self.current_step_total_effort - self.current_step_spent_effort}')
+            logger.debug('Rectifying progress by %s', self.current_step_total_effort - self.current_step_spent_effort)
             self._display.advance_progress_bar(
                 task_id=self.progress_id,
                 advance_by=self.current_step_total_effort - self.current_step_spent_effort)
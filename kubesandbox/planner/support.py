@@ -1,6 +1,6 @@
-from typing import Optional, Self
+from typing import Any, Optional, Self
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from kubesandbox.exception_classes import NoCommandSpecifiedException
 from kubesandbox.storage import Resource
@@ -18,6 +18,9 @@ class DisplayMessages(BaseModel):
         success_instructions: Instructions to be displayed after successful execution of the step.
         failure_instructions: Instructions to be displayed after failed execution of the step.
     """
+    # Shared between steps and never modified
+    model_config = ConfigDict(frozen=True)
+
     success_message: Optional[str] = None
     failure_message: Optional[str] = None
     ongoing_message: Optional[str] = None
@@ -36,6 +39,7 @@ class Step(BaseModel):
         command: The command to execute for the step.
         args: A list of arguments for the command.
         quoted_command: A quoted command to execute for the step.
+        stdin: Text passed to the standard input of the command.
         optional: Whether the step is optional.
         on_success: The step to execute if the current step succeeds.
         on_failure: The step to execute if the current step fails.
@@ -44,15 +48,16 @@ class Step(BaseModel):
         execution_effort: The total effort required for the step and its sub-steps.
     """
     name: str
-    dependencies: list[str] = []
+    dependencies: list[str] = Field(default_factory=list)
     command: Optional[str] = None
-    args: list[str] = []
+    args: list[str] = Field(default_factory=list)
     quoted_command: Optional[str] = None
+    stdin: Optional[str] = None
     optional: bool = False
     on_success: Optional['Step'] = None
     on_failure: Optional['Step'] = None
     display_messages: DisplayMessages
-    resources: list[Resource] = []
+    resources: list[Resource] = Field(default_factory=list)
     execution_effort: int = 0
 
     @model_validator(mode='after')
@@ -70,6 +75,25 @@ class Step(BaseModel):
             raise NoCommandSpecifiedException('Neither "command" nor "quoted_command" was specified for the step.')
         return self
 
+    @classmethod
+    def build(cls, **data: Any) -> Self:
+        """
+        Builds a step from trusted internal data without running field validation. Display messages may be passed as
+        a dictionary. The command check is still applied, as construction skips model validators.
+
+        Args:
+            **data: The fields of the step.
+
+        Raises:
+            NoCommandSpecifiedException: If neither "command" nor "quoted_command" is specified.
+
+        Returns:
+            The Step instance.
+        """
+        if isinstance(data.get('display_messages'), dict):
+            data['display_messages'] = DisplayMessages.model_construct(**data['display_messages'])
+        return cls.model_construct(**data).check_command()
+
 
 # TODO support for direct install command and requires_root flag
 class InstallationSource(BaseModel):
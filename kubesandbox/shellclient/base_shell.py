@@ -4,10 +4,19 @@ import platform
 import shlex
 import shutil
 import subprocess
+from dataclasses import dataclass
+from functools import cache
 
 logger = logging.getLogger('Shell')
 
+# Platforms recognized from the platform string, in order of priority
+known_platforms = ('ubuntu', 'debian', 'fedora', 'windows')
+# Package managers probed in order when the platform string is not recognized, with the platform they indicate
+package_manager_platforms = (('apt', 'debian'), ('dnf', 'fedora'), ('apk', 'alpine'), ('pacman', 'arch'),
+                             ('emerge', 'gentoo'))
 
+
+@dataclass(slots=True, frozen=True)
 class ProcessResult:
     """
     Represents the result of a process execution.
@@ -17,16 +26,9 @@ class ProcessResult:
         stdout: The standard output of the process.
         stderr: The standard error output of the process.
     """
-
-    def __init__(self, exit_code: int, stdout: str, stderr: str):
-        self.exit_code = exit_code
-        self.stdout = stdout
-        self.stderr = stderr
-
-    def __eq__(self, other):
-        if isinstance(other, ProcessResult):
-            return self.exit_code == other.exit_code and self.stdout == other.stdout and self.stderr == other.stderr
-        return False
+    exit_code: int
+    stdout: str
+    stderr: str
 
 
 class NoCommandException(Exception):
@@ -57,13 +59,14 @@ class Shell:
         return os.geteuid() == 0
 
     @staticmethod
-    def execute_command(command: list[str] = None, direct_command: str = None) -> ProcessResult:
+    def execute_command(command: list[str] = None, direct_command: str = None, stdin: str = None) -> ProcessResult:
         """
         Executes a shell command.
 
         Args:
             command: A list of strings representing the command and its arguments.
             direct_command: A string representing the command to execute directly.
+            stdin: Text passed to the standard input of the command. Only used with "command".
 
         Returns:
             A ProcessResult object containing the exit code, standard output, and standard error output of the process.
@@ -75,19 +78,20 @@ class Shell:
             raise NoCommandException('No command to execute')
 
         if direct_command:
-            logger.info(f'Executing command: "{direct_command}"')
-            process = subprocess.Popen(direct_command, shell=True, stdout=subprocess.PIPE, text=True)
-            stdout = process.stdout.read() if process.stdout else ''
-            stderr = process.stderr.read() if process.stderr else ''
-            process.communicate()
+            logger.info('Executing command: "%s"', direct_command)
+            # Both pipes are drained together and decoded once, which cannot deadlock on a full pipe
+            process = subprocess.run(direct_command, shell=True, capture_output=True)
+            stdout = process.stdout.decode('utf-8', errors='replace')
+            stderr = process.stderr.decode('utf-8', errors='replace')
             exit_code = process.returncode
-            logger.info(f'Command exited with code {exit_code}. \nStdout: {stdout}. \nStderr: {stderr}')
+            logger.info('Command exited with code %s. \nStdout: %s. \nStderr: %s', exit_code, stdout, stderr)
             return ProcessResult(exit_code=exit_code, stdout=stdout, stderr=stderr)
         else:
-            logger.info(f'Executing command: "{shlex.join(command)}"')
-            process = subprocess.run(command, shell=False, capture_output=True, text=True)
-            logger.info(
-                f'Command exited with code {process.returncode}. \nStdout: {process.stdout}. \nStderr: {process.stderr}')
+            if logger.isEnabledFor(logging.INFO):
+                logger.info('Executing command: "%s"', shlex.join(command))
+            process = subprocess.run(command, shell=False, capture_output=True, text=True, input=stdin)
+            logger.info('Command exited with code %s. \nStdout: %s. \nStderr: %s', process.returncode, process.stdout,
+                        process.stderr)
             return ProcessResult(exit_code=process.returncode, stdout=process.stdout, stderr=process.stderr)
 
     # @abstractmethod
@@ -95,9 +99,11 @@ class Shell:
     #     pass
 
     @staticmethod
+    @cache
     def get_platform() -> str:
         """
-        Determines the current operating system platform.
+        Determines the current operating system platform. The result is cached, as the platform cannot change while
+        the process runs.
 
         Returns:
             The name of the current platform.
@@ -105,14 +111,9 @@ class Shell:
         logger.info('Checking current platform')
         platform_str = platform.platform().lower()
 
-        if platform_str.count('ubuntu') > 0:
-            current_platform = 'ubuntu'
-        elif platform_str.count('debian') > 0:
-            current_platform = 'debian'
-        elif platform_str.count('fedora') > 0:
-            current_platform = 'fedora'
-        elif platform_str.count('windows') > 0:
-            current_platform = 'windows'
+        for current_platform in known_platforms:
+            if current_platform in platform_str:
+                break
         # elif platform_str.count('linux') > 0 and platform_str.count('wsl') > 0:
         #     platform_str = 'wsl'
         else:
@@ -124,23 +125,16 @@ class Shell:
         return current_platform
 
     @staticmethod
+    @cache
     def get_platform_using_package_manager() -> str:
         """
-        Determines the current platform using the package manager.
+        Determines the current platform using the package manager. The PATH is only probed on the first call.
 
         Returns:
             The name of the current platform.
         """
         logger.info('Checking current platform using package manager')
-        if shutil.which('apt'):
-            return 'debian'
-        elif shutil.which('dnf'):
-            return 'fedora'
-        elif shutil.which('apk'):
-            return 'alpine'
-        elif shutil.which('pacman'):
-            return 'arch'
-        elif shutil.which('emerge'):
-            return 'gentoo'
-        else:
-            return 'unknown'
+        for package_manager, package_manager_platform in package_manager_platforms:
+            if shutil.which(package_manager):
+                return package_manager_platform
+        return 'unknown'
@@ -1,26 +1,30 @@
-from typing import Optional
+from typing import ClassVar, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Resource(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     path: str
     type: str
     details: Optional[str] = '-'
     reference: Optional[str] = '-'
 
-    @staticmethod
-    def get_table_header():
-        header = '| Name | Type | Path | Details | References |\n'
-        header += '| --- | --- | --- | --- | --- |\n'
-        return header
+    table_header: ClassVar[str] = '| Name | Type | Path | Details | References |\n| --- | --- | --- | --- | --- |\n'
+
+    @classmethod
+    def get_table_header(cls):
+        return cls.table_header
 
     def get_row_markdown(self):
         return f'| {self.name} | {self.type} | {self.path} | {self.details} | {self.reference} |\n'
 
 
 class CommandOutput(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     title: str
     stdout: str
     stderr: str
@@ -41,6 +45,8 @@ class CommandOutput(BaseModel):
 
 
 class ReportNote(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     title: Optional[str] = None
     message: str
 
@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 import sys
 import traceback
@@ -20,36 +21,35 @@ class Patcher:
             raise RuntimeError(f'Unsupported operating system for this module: {os.name}')
 
     @staticmethod
-    def execute(command: str, on_complete='done\n'):
-        process = subprocess.Popen(f'{command} && echo {on_complete}', shell=True, stdin=subprocess.PIPE, text=True)
-        process.communicate()
+    def execute(command: list[str], on_complete='done\n', stdin: str | None = None, stdout: int | None = None):
+        process = subprocess.run(command, input=stdin, stdout=stdout, text=True)
+        if process.returncode == 0:
+            print(on_complete, end='')
 
     @staticmethod
     def patch_docker_cgroup_permissions():
         print('Patching docker cgroup permissions\n')
 
         print('Creating systemd directory')
-        Patcher.execute('sudo mkdir -p /etc/systemd/system/user@.service.d')
+        Patcher.execute(['sudo', 'mkdir', '-p', '/etc/systemd/system/user@.service.d'])
 
         print('Creating delegate.conf')
-        Patcher.execute('''sudo bash -c "cat > /etc/systemd/system/user@.service.d/delegate.conf << EOF
-[Service]
-Delegate=cpu cpuset io memory pids 
-EOF"''')
+        Patcher.execute(['sudo', 'tee', '/etc/systemd/system/user@.service.d/delegate.conf'],
+                        stdin='[Service]\nDelegate=cpu cpuset io memory pids\n', stdout=subprocess.DEVNULL)
 
         print('Reloading systemd')
-        Patcher.execute('sudo systemctl daemon-reload')
+        Patcher.execute(['sudo', 'systemctl', 'daemon-reload'])
 
     @staticmethod
     def patch_docker_port_permissions():
         print('Patching docker port permissions')
 
         print('Setting port capabilities for docker')
-        Patcher.execute('sudo setcap cap_net_bind_service=ep $(which rootlesskit)')
+        Patcher.execute(['sudo', 'setcap', 'cap_net_bind_service=ep', shutil.which('rootlesskit') or 'rootlesskit'])
 
         print('Restarting docker')
-        Patcher.execute('systemctl --user restart docker')
-        Patcher.execute('sudo systemctl restart docker')
+        Patcher.execute(['systemctl', '--user', 'restart', 'docker'])
+        Patcher.execute(['sudo', 'systemctl', 'restart', 'docker'])
 
     @staticmethod
     def fix_rootless_docker():
@@ -59,7 +59,7 @@ EOF"''')
                 sys.exit(0)
             else:
                 print('This process requires admin access. Please authenticate where required.\n\n')
-                Patcher.execute('sudo echo ""', '')
+                Patcher.execute(['sudo', '-v'], '')
                 Patcher.patch_docker_port_permissions()
                 Patcher.patch_docker_cgroup_permissions()
         except:
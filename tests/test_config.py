@@ -0,0 +1,34 @@
+import json
+import logging
+
+import pytest
+from pydantic import ValidationError
+
+from kubesandbox import config
+
+
+@pytest.fixture
+def installer_config(monkeypatch):
+    def set_installer_config(installer_config_dict):
+        monkeypatch.setattr(config, 'installer_config', json.dumps(installer_config_dict))
+        config.get_installation_sources.cache_clear()
+
+    yield set_installer_config
+    config.get_installation_sources.cache_clear()
+
+
+def test_get_installation_sources(installer_config):
+    installer_config({'k3d': {'url': 'https://example.com/install.sh'}})
+
+    installation_sources = config.get_installation_sources()
+    assert list(installation_sources) == ['k3d']
+    assert installation_sources['k3d'].url == 'https://example.com/install.sh'
+    assert not installation_sources['k3d'].requires_root
+
+
+def test_get_installation_sources_invalid_entry(installer_config, caplog):
+    installer_config({'k3d': {'url': 'https://example.com/install.sh'}, 'helm': {'requires_root': True}})
+
+    with caplog.at_level(logging.ERROR, logger='App.Config'), pytest.raises(ValidationError):
+        config.get_installation_sources()
+    assert 'Invalid installer config for "helm"' in caplog.text
@@ -1,9 +1,12 @@
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import Mock, patch
 
+import httpx
 import pytest
 
+from kubesandbox import config
 from kubesandbox.exception_classes import UnknownPackageException, InstallationFailedException, \
-    ExecutionFailureException
+    ExecutionFailureException, NoCommandSpecifiedException
 from kubesandbox.planner.planner import ExecutionPlanner
 from kubesandbox.planner.support import Step, InstallationSource, DisplayMessages
 from kubesandbox.shellclient.base_shell import ProcessResult
@@ -31,11 +34,21 @@ sample_installation_source = InstallationSource(
     request_headers={}
 )
 
+success_result = ProcessResult(stdout='success', stderr='', exit_code=0)
+
+failure_result = ProcessResult(stdout='fail', stderr='error', exit_code=1)
+
+
+@pytest.fixture(autouse=True)
+def script_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'script_cache_dir', str(tmp_path / 'scripts'))
+    return tmp_path / 'scripts'
+
 
 # Mock classes
 class MockShell:
     def execute_command(self, *args, **kwargs):
-        return ProcessResult(stdout='success', stderr='', exit_code=0)
+        return success_result
 
 
 class MockRichDisplay:
@@ -61,13 +74,45 @@ class MockRichDisplay:
         return 1
 
 
+def mock_response(status_code, text='', headers=None):
+    response = Mock(spec_set=['status_code', 'text', 'headers'])
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+class MockScriptServer:
+    def __init__(self):
+        self.requests = []
+        self.respond(200, 'installation_script')
+
+    def respond(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def handle(self, request):
+        self.requests.append(request)
+        return httpx.Response(self.status_code, text=self.text, headers=self.headers)
+
+
+@pytest.fixture(autouse=True)
+def script_server(monkeypatch):
+    server = MockScriptServer()
+    client_class = httpx.Client
+    monkeypatch.setattr(httpx, 'Client', lambda: client_class(transport=httpx.MockTransport(server.handle)))
+    return server
+
+
+@pytest.fixture
+def planner():
+    return ExecutionPlanner(steps=[sample_step], installation_sources={'sample_package': sample_installation_source},
+                            shell=MockShell(), display=MockRichDisplay())
+
+
 # Test __init__ method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_init(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
+def test_init(planner):
     assert planner.steps == [sample_step]
     assert isinstance(planner._shell, MockShell)
     assert isinstance(planner._display, MockRichDisplay)
@@ -78,48 +123,108 @@ def test_init(MockShellClass, MockRichDisplayClass):
 
 
 # Test __download_package_installation_script method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-@patch('httpx.get')
-def test_download_package_installation_script(mock_httpx_get, MockShellClass, MockRichDisplayClass):
-    mock_httpx_get.return_value = MagicMock(status_code=200, text='installation_script')
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
+def test_download_package_installation_script(script_server, planner):
     script = planner._ExecutionPlanner__download_package_installation_script('sample_package')
     assert script == 'installation_script'
 
-    mock_httpx_get.return_value = MagicMock(status_code=404)
+    script_server.respond(404)
     with pytest.raises(InstallationFailedException):
         planner._ExecutionPlanner__download_package_installation_script('sample_package')
 
 
+@patch('kubesandbox.planner.planner.httpx.Client')
+def test_download_package_installation_script_reuses_client(MockClient, planner):
+    MockClient.return_value.get.return_value = mock_response(status_code=200, text='installation_script')
+    planner.installation_sources['other_package'] = sample_installation_source
+
+    planner._ExecutionPlanner__download_package_installation_script('sample_package')
+    planner._ExecutionPlanner__download_package_installation_script('other_package')
+    assert MockClient.call_count == 1
+    assert MockClient.return_value.get.call_count == 2
+
+    planner._ExecutionPlanner__close_http_client()
+    MockClient.return_value.close.assert_called_once()
+    assert planner._http_client is None
+
+
+def test_download_package_installation_scripts(script_server, planner):
+    planner.installation_sources['other_package'] = sample_installation_source
+
+    planner._ExecutionPlanner__download_package_installation_scripts(
+        ['sample_package', 'other_package', 'unknown_package'])
+    assert planner._installation_scripts == {'sample_package': 'installation_script',
+                                             'other_package': 'installation_script'}
+
+    with patch.object(planner, '_ExecutionPlanner__execute_package_installation_script') as mock_execute:
+        planner._ExecutionPlanner__install_package('sample_package')
+        mock_execute.assert_called_once_with('sample_package', 'installation_script')
+    assert len(script_server.requests) == 2
+
+    script_server.respond(404)
+    with pytest.raises(InstallationFailedException):
+        planner._ExecutionPlanner__download_package_installation_scripts(['sample_package'])
+
+
+def test_download_package_installation_scripts_share_client(script_server, planner, monkeypatch):
+    clients = []
+    create_mock_client = httpx.Client
+
+    def create_client():
+        # A slow client creation leaves time for other downloads to race past an unguarded check
+        time.sleep(0.05)
+        clients.append(create_mock_client())
+        return clients[-1]
+
+    monkeypatch.setattr(httpx, 'Client', create_client)
+    packages = [f'package_{index}' for index in range(4)]
+    planner.installation_sources.update(dict.fromkeys(packages, sample_installation_source))
+
+    planner._ExecutionPlanner__download_package_installation_scripts(packages)
+    assert len(clients) == 1
+    assert len(script_server.requests) == 4
+
+    planner._ExecutionPlanner__close_http_client()
+    assert clients[0].is_closed
+
+
+def test_download_package_installation_script_cached(script_server, script_cache_dir, planner):
+    script_server.respond(200, 'installation_script', headers={'etag': '"v1"'})
+
+    assert planner._ExecutionPlanner__download_package_installation_script('sample_package') == 'installation_script'
+    assert 'if-none-match' not in script_server.requests[-1].headers
+    assert len(list(script_cache_dir.iterdir())) == 2
+
+    script_server.respond(304)
+    assert planner._ExecutionPlanner__download_package_installation_script('sample_package') == 'installation_script'
+    assert script_server.requests[-1].headers['if-none-match'] == '"v1"'
+
+
+def test_download_package_installation_script_cache_mismatch(script_server, script_cache_dir, planner):
+    script_server.respond(200, 'installation_script', headers={'etag': '"v1"'})
+    planner._ExecutionPlanner__download_package_installation_script('sample_package')
+
+    script_file = next(script_cache_dir.glob('*.sh'))
+    script_file.write_text('truncated')
+
+    script_server.respond(200, 'updated_script', headers={'etag': '"v2"'})
+    assert planner._ExecutionPlanner__download_package_installation_script('sample_package') == 'updated_script'
+    assert 'if-none-match' not in script_server.requests[-1].headers
+    assert script_file.read_text() == 'updated_script'
+
+
 # Test __execute_package_installation_script method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_execute_package_installation_script(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    with patch.object(planner._shell, 'execute_command',
-                      return_value=ProcessResult(stdout='success', stderr='', exit_code=0)):
+def test_execute_package_installation_script(planner):
+    with patch.object(planner._shell, 'execute_command', return_value=success_result) as mock_execute:
         planner._ExecutionPlanner__execute_package_installation_script('sample_package', 'installation_script')
+        mock_execute.assert_called_once_with(command=['bash', '-s'], stdin='installation_script')
 
-    with patch.object(planner._shell, 'execute_command',
-                      return_value=ProcessResult(stdout='fail', stderr='error', exit_code=1)):
+    with patch.object(planner._shell, 'execute_command', return_value=failure_result):
         with pytest.raises(InstallationFailedException):
             planner._ExecutionPlanner__execute_package_installation_script('sample_package', 'installation_script')
 
 
 # Test __install_package method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_install_package(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
+def test_install_package(planner):
     with patch.object(planner, '_ExecutionPlanner__download_package_installation_script',
                       return_value='installation_script'), \
             patch.object(planner, '_ExecutionPlanner__execute_package_installation_script'):
@@ -130,69 +235,60 @@ def test_install_package(MockShellClass, MockRichDisplayClass):
 
 
 # Test __install_packages method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_install_packages(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    with patch.object(planner._shell, 'execute_command',
-                      return_value=ProcessResult(stdout='root', stderr='', exit_code=0)), \
+def test_install_packages(planner):
+    with patch.object(planner._shell, 'execute_command', return_value=success_result), \
+            patch.object(planner, '_ExecutionPlanner__download_package_installation_scripts') as mock_download, \
             patch.object(planner, '_ExecutionPlanner__install_package'):
         planner._ExecutionPlanner__install_packages({'sample_package'})
+        mock_download.assert_called_once_with(['sample_package'])
 
-    with patch.object(planner._shell, 'execute_command',
-                      return_value=ProcessResult(stdout='', stderr='error', exit_code=1)):
+    with patch.object(planner._shell, 'execute_command', return_value=failure_result):
         with pytest.raises(ExecutionFailureException):
             planner._ExecutionPlanner__install_packages({'sample_package'})
 
 
 # Test __get_missing_dependencies method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_get_missing_dependencies(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
+def test_get_missing_dependencies(planner):
     with patch('shutil.which', return_value=None):
         assert planner._ExecutionPlanner__get_missing_dependencies() == set(sample_step.dependencies)
 
 
-# Test __get_step_effort method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_get_step_effort(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
+def test_get_missing_dependencies_looks_up_once():
+    steps = [
+        Step(name='first', command='k3d', dependencies=['k3d', 'docker'], display_messages=sample_display_messages),
+        Step(name='second', command='k3d', dependencies=['k3d', 'kubectl'], display_messages=sample_display_messages)
+    ]
+    planner = ExecutionPlanner(steps=steps, shell=MockShell(), display=MockRichDisplay())
+
+    with patch('shutil.which', side_effect=lambda name: None if name == 'kubectl' else f'/usr/bin/{name}') as which:
+        assert planner._ExecutionPlanner__get_missing_dependencies() == {'kubectl'}
+        assert which.call_count == 3
 
+
+# Test __get_step_effort method
+def test_get_step_effort(planner):
     step = Step(name='test_step', on_success=sample_step, command='ls', display_messages=sample_display_messages)
     assert planner._ExecutionPlanner__get_step_effort(step) == 2
 
 
-# Test __get_plan_effort method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_get_plan_effort(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
+def test_get_step_effort_deep_chain(planner):
+    step = Step(name='leaf', command='ls', display_messages=sample_display_messages)
+    for i in range(2000):
+        step = Step(name=f'step_{i}', command='ls', display_messages=sample_display_messages,
+                    on_success=step, on_failure=Step(name=f'fallback_{i}', command='ls',
+                                                     display_messages=sample_display_messages))
+    assert planner._ExecutionPlanner__get_step_effort(step) == 4001
+    assert step.on_success.execution_effort == 3999
+    assert step.on_failure.execution_effort == 1
+
 
+# Test __get_plan_effort method
+def test_get_plan_effort(planner):
     assert planner._ExecutionPlanner__get_plan_effort() == 1
 
 
 # Test execute method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-@patch('httpx.get')
-def test_execute(mock_httpx_get, MockShellClass, MockRichDisplayClass):
-    mock_httpx_get.return_value = MagicMock(status_code=200, text='installation_script')
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
+def test_execute(planner):
     with patch.object(planner, '_ExecutionPlanner__get_missing_dependencies', return_value=set()), \
             patch.object(planner, '_ExecutionPlanner__get_plan_effort', return_value=1), \
             patch.object(planner, '_ExecutionPlanner__execute_step'):
@@ -200,51 +296,38 @@ def test_execute(mock_httpx_get, MockShellClass, MockRichDisplayClass):
 
 
 # Test __execute_step method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_execute_step(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    with patch.object(planner, '_ExecutionPlanner__update_display_for_step_start'), \
-            patch.object(planner, '_ExecutionPlanner__execute_step'):
+def test_execute_step(planner):
+    with patch.object(config.storage, 'outputs', []), \
+            patch.object(planner._shell, 'execute_command', return_value=success_result) as mock_execute, \
+            patch.object(planner, '_ExecutionPlanner__on_step_success') as mock_success:
+        planner._ExecutionPlanner__execute_step(sample_step)
+        mock_execute.assert_called_once_with(command=['echo', 'Hello'], stdin=sample_step.stdin)
+        mock_success.assert_called_once_with(sample_step)
+        assert config.storage.outputs[0].stdout == 'success'
+    assert planner.current_step_spent_effort == 1
+
+    with patch.object(config.storage, 'outputs', []), \
+            patch.object(planner._shell, 'execute_command', return_value=failure_result), \
+            patch.object(planner, '_ExecutionPlanner__on_step_failure') as mock_failure:
         planner._ExecutionPlanner__execute_step(sample_step)
+        mock_failure.assert_called_once_with(sample_step, failure_result)
+    assert planner.current_step_spent_effort == 2
 
 
 # Test __on_step_failure method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_on_step_failure(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    result = ProcessResult(stdout='output', stderr='error', exit_code=1)
+def test_on_step_failure(planner):
     with pytest.raises(ExecutionFailureException):
-        planner._ExecutionPlanner__on_step_failure(sample_step, result)
+        planner._ExecutionPlanner__on_step_failure(sample_step, failure_result)
 
 
 # Test __on_step_success method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_on_step_success(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
+def test_on_step_success(planner):
     with patch.object(planner, '_ExecutionPlanner__execute_step'):
         planner._ExecutionPlanner__on_step_success(sample_step)
 
 
 # Test __update_display_for_step_start method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_update_display_for_step_start(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
+def test_update_display_for_step_start(planner):
     with patch.object(planner._display, 'add_item_to_logs'), \
             patch.object(planner._display, 'set_details_message'), \
             patch.object(planner._display, 'start'):
@@ -252,12 +335,7 @@ def test_update_display_for_step_start(MockShellClass, MockRichDisplayClass):
 
 
 # Test __rectify_progress method
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-def test_rectify_progress(MockShellClass, MockRichDisplayClass):
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
+def test_rectify_progress(planner):
     planner.current_step_total_effort = 2
     planner.current_step_spent_effort = 1
 
@@ -271,21 +349,13 @@ def test_rectify_progress(MockShellClass, MockRichDisplayClass):
         planner._ExecutionPlanner__rectify_progress()
 
 
-# Test full coverage of ExecutionPlanner class
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-@patch('httpx.get')
-def test_execution_planner_full_coverage(mock_httpx_get, MockShellClass, MockRichDisplayClass):
-    mock_httpx_get.return_value = MagicMock(status_code=200, text='installation_script')
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    with patch.object(planner, '_ExecutionPlanner__get_missing_dependencies', return_value={'sample_package'}), \
+# Test execute method end to end, with and without missing dependencies
+@pytest.mark.parametrize('missing_dependencies', [set(), {'sample_package'}])
+def test_execute_installs_missing_dependencies(planner, missing_dependencies):
+    with patch.object(planner, '_ExecutionPlanner__get_missing_dependencies', return_value=missing_dependencies), \
             patch.object(planner, '_ExecutionPlanner__get_plan_effort', return_value=1), \
             patch.object(planner, '_ExecutionPlanner__execute_step'), \
-            patch.object(planner._shell, 'execute_command',
-                         return_value=ProcessResult(stdout='root', stderr='', exit_code=0)), \
+            patch.object(planner._shell, 'execute_command', return_value=success_result), \
             patch.object(planner, '_ExecutionPlanner__install_package'), \
             patch.object(planner._display, 'start'), \
             patch.object(planner._display, 'stop'):
@@ -294,53 +364,15 @@ def test_execution_planner_full_coverage(mock_httpx_get, MockShellClass, MockRic
         assert planner._ExecutionPlanner__get_missing_dependencies.called
         assert planner._ExecutionPlanner__get_plan_effort.called
         assert planner._ExecutionPlanner__execute_step.called
-        assert planner._shell.execute_command.called
-        assert planner._ExecutionPlanner__install_package.called
+        assert planner._shell.execute_command.called == bool(missing_dependencies)
+        assert planner._ExecutionPlanner__install_package.call_count == len(missing_dependencies)
         assert planner._display.start.called
         assert planner._display.stop.called
 
-        assert planner._ExecutionPlanner__get_step_effort(sample_step) == 1
-        assert planner._ExecutionPlanner__get_plan_effort() == 1
-        assert planner._ExecutionPlanner__download_package_installation_script('sample_package') == 'installation_script'
-        assert planner._ExecutionPlanner__execute_package_installation_script('sample_package',
-                                                                              'installation_script') is None
-        planner._ExecutionPlanner__install_package.assert_called_once_with('sample_package')
-        assert planner._ExecutionPlanner__on_step_success(sample_step) is None
-        assert planner._ExecutionPlanner__update_display_for_step_start(sample_step, 'parent') is None
-        assert planner._ExecutionPlanner__rectify_progress() is None
-
-@patch('kubesandbox.planner.planner.Shell', new_callable=lambda: MockShell)
-@patch('kubesandbox.planner.planner.RichDisplay', new_callable=lambda: MockRichDisplay)
-@patch('httpx.get')
-def test_execution_planner_full_coverage_missing_dependencies(mock_httpx_get, MockShellClass, MockRichDisplayClass):
-    mock_httpx_get.return_value = MagicMock(status_code=200, text='installation_script')
-    steps = [sample_step]
-    installation_sources = {'sample_package': sample_installation_source}
-    planner = ExecutionPlanner(steps=steps, installation_sources=installation_sources)
-
-    with patch.object(planner, '_ExecutionPlanner__get_missing_dependencies', return_value=set()), \
-            patch.object(planner, '_ExecutionPlanner__get_plan_effort', return_value=1), \
-            patch.object(planner, '_ExecutionPlanner__execute_step'), \
-            patch.object(planner._shell, 'execute_command',
-                         return_value=ProcessResult(stdout='root', stderr='', exit_code=0)), \
-            patch.object(planner, '_ExecutionPlanner__install_package'), \
-            patch.object(planner._display, 'start'), \
-            patch.object(planner._display, 'stop'):
-        planner.execute()
 
-        assert planner._ExecutionPlanner__get_missing_dependencies.called
-        assert planner._ExecutionPlanner__get_plan_effort.called
-        assert planner._ExecutionPlanner__execute_step.called
-        assert not planner._shell.execute_command.called
-        assert not planner._ExecutionPlanner__install_package.called
-        assert planner._display.start.called
-        assert planner._display.stop.called
+def test_step_build():
+    step = Step.build(name='build_step', command='ls', display_messages={'ongoing_message': 'Listing'})
+    assert step == Step(name='build_step', command='ls', display_messages=DisplayMessages(ongoing_message='Listing'))
 
-        assert planner._ExecutionPlanner__get_step_effort(sample_step) == 1
-        assert planner._ExecutionPlanner__get_plan_effort() == 1
-        assert planner._ExecutionPlanner__download_package_installation_script('sample_package') == 'installation_script'
-        assert planner._ExecutionPlanner__execute_package_installation_script('sample_package',
-                                                                              'installation_script') is None
-        assert planner._ExecutionPlanner__on_step_success(sample_step) is None
-        assert planner._ExecutionPlanner__update_display_for_step_start(sample_step, 'parent') is None
-        assert planner._ExecutionPlanner__rectify_progress() is None
+    with pytest.raises(NoCommandSpecifiedException):
+        Step.build(name='build_step', display_messages={})
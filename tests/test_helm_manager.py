@@ -1,17 +1,19 @@
-from unittest.mock import patch
+import logging
 
 import pytest
 
 from kubesandbox.helm.helm_manager import HelmManager, HelmChart
 from kubesandbox.planner.support import Step, DisplayMessages
 
+sample_values = {'key1': 'value1', 'key2': 'value2'}
 
-@pytest.fixture
-def helm_manager():
-    return HelmManager()
 
+@pytest.fixture(scope='module')
+def base_chart():
+    return HelmChart(release_name='my-chart', chart='my-chart')
 
-def test_list_keys(helm_manager):
+
+def test_list_keys():
     test_dict = {
         'level1': {
             'level2': 'value1',
@@ -29,54 +31,41 @@ def test_list_keys(helm_manager):
     assert HelmManager.list_keys(test_dict) == expected_output
 
 
-def test_get_install_args_basic(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart')
-    expected_args = ['install', 'my-chart', 'my-chart']
+def test_iter_keys_with_path():
+    test_dict = {'level1': {'level2': {'level3': 'value1'}}, 'level4': 'value2'}
+    assert list(HelmManager.iter_keys(test_dict, 'root')) == [
+        ('root.level1.level2.level3', 'value1'),
+        ('root.level4', 'value2')
+    ]
+
+
+@pytest.mark.parametrize('chart_args, expected_args', [
+    ({}, ['install', 'my-chart', 'my-chart']),
+    ({'wait': True}, ['install', 'my-chart', 'my-chart', '--wait']),
+    ({'timeout': '300'}, ['install', 'my-chart', 'my-chart', '--timeout', '300']),
+    ({'repository_url': 'https://example.com/charts'},
+     ['install', 'my-chart', 'my-chart', '--repo', 'https://example.com/charts']),
+    ({'namespace': 'my-namespace'},
+     ['install', 'my-chart', 'my-chart', '--namespace', 'my-namespace', '--create-namespace']),
+    ({'version': '1.2.3'}, ['install', 'my-chart', 'my-chart', '--version', '1.2.3']),
+    ({'values': sample_values},
+     ['install', 'my-chart', 'my-chart', '--set', 'key1=value1', '--set', 'key2=value2'])
+])
+def test_get_install_args(chart_args, expected_args, base_chart):
+    helm_chart = base_chart.model_copy(update=chart_args)
     assert HelmManager.get_install_args(helm_chart) == expected_args
 
 
-def test_get_install_args_with_wait(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', wait=True)
-    expected_args = ['install', 'my-chart', 'my-chart', '--wait']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_get_install_args_with_timeout(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', timeout='300')
-    expected_args = ['install', 'my-chart', 'my-chart', '--timeout', '300']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_get_install_args_with_repository_url(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', repository_url='https://example.com/charts')
-    expected_args = ['install', 'my-chart', 'my-chart', '--repo', 'https://example.com/charts']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_get_install_args_with_namespace(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', namespace='my-namespace')
-    expected_args = ['install', 'my-chart', 'my-chart', '--namespace', 'my-namespace', '--create-namespace']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_get_install_args_with_version(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', version='1.2.3')
-    expected_args = ['install', 'my-chart', 'my-chart', '--version', '1.2.3']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_get_install_args_with_values(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', values={'key1': 'value1', 'key2': 'value2'})
-    expected_args = ['install', 'my-chart', 'my-chart', '--set', 'key1=value1', '--set', 'key2=value2']
-    assert HelmManager.get_install_args(helm_chart) == expected_args
-
-
-def test_generate_chart_installation_step_basic(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart')
+@pytest.mark.parametrize('chart_args, ongoing_message', [
+    ({}, 'Installing Helm chart My-Chart'),
+    ({'display_messages': DisplayMessages(ongoing_message='Custom message')}, 'Custom message')
+])
+def test_generate_chart_installation_step(chart_args, ongoing_message, base_chart):
+    helm_chart = base_chart.model_copy(update=chart_args)
     expected_step = Step(
         name='Install My-Chart',
         display_messages=DisplayMessages(
-            ongoing_message='Installing Helm chart My-Chart',
+            ongoing_message=ongoing_message,
             success_message='Helm chart My-Chart installed successfully',
             failure_message='Helm chart My-Chart installation failed'
         ),
@@ -88,47 +77,32 @@ def test_generate_chart_installation_step_basic(helm_manager):
     assert HelmManager.generate_chart_installation_step(helm_chart) == expected_step
 
 
-def test_generate_chart_installation_step_with_display_messages(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart',
-                           display_messages=DisplayMessages(ongoing_message='Custom message'))
-    expected_step = Step(
-        name='Install My-Chart',
-        display_messages=DisplayMessages(
-            ongoing_message='Custom message',
-            success_message='Helm chart My-Chart installed successfully',
-            failure_message='Helm chart My-Chart installation failed'
-        ),
-        dependencies=['helm'],
-        command='helm',
-        args=['install', 'my-chart', 'my-chart'],
-        optional=False
-    )
-    assert HelmManager.generate_chart_installation_step(helm_chart) == expected_step
+def test_install_chart(base_chart):
+    expected_commands = ['helm', 'install', 'my-chart', 'my-chart']
+    assert HelmManager.install_chart(base_chart) == expected_commands
 
 
-def test_install_chart(helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart')
-    expected_commands = ['helm', 'install', 'my-chart', 'my-chart']
-    assert HelmManager.install_chart(helm_chart) == expected_commands
+def logged_messages(caplog, level):
+    return [record.getMessage() for record in caplog.records
+            if record.name == 'App.HelmManager' and record.levelno == level]
 
 
-@patch('kubesandbox.helm.helm_manager.logger.info')
-def test_install_chart_logging(mock_logger, helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart')
-    HelmManager.install_chart(helm_chart)
-    mock_logger.assert_called_once_with(
-        f'Installing Helm chart "{helm_chart.chart}" with release name "{helm_chart.release_name}"')
+def test_install_chart_logging(base_chart, caplog):
+    with caplog.at_level(logging.DEBUG, logger='App.HelmManager'):
+        HelmManager.install_chart(base_chart)
+    assert logged_messages(caplog, logging.INFO) == [
+        f'Installing Helm chart "{base_chart.chart}" with release name "{base_chart.release_name}"']
 
 
-@patch('kubesandbox.helm.helm_manager.logger.debug')
-def test_get_install_args_logging_debug(mock_logger, helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', values={'key1': 'value1', 'key2': 'value2'})
-    HelmManager.get_install_args(helm_chart)
-    mock_logger.assert_called_once_with(f'Using values:\n {helm_chart.values}')
+def test_get_install_args_logging_debug(base_chart, caplog):
+    helm_chart = base_chart.model_copy(update={'values': sample_values})
+    with caplog.at_level(logging.DEBUG, logger='App.HelmManager'):
+        HelmManager.get_install_args(helm_chart)
+    assert logged_messages(caplog, logging.DEBUG) == [f'Using values:\n {helm_chart.values}']
 
 
-@patch('kubesandbox.helm.helm_manager.logger.info')
-def test_get_install_args_logging_info(mock_logger, helm_manager):
-    helm_chart = HelmChart(release_name='my-chart', chart='my-chart', wait=True)
-    HelmManager.get_install_args(helm_chart)
-    mock_logger.assert_called_once_with(f'Will wait for Helm chart "{helm_chart.chart}" to start up.')
+def test_get_install_args_logging_info(base_chart, caplog):
+    helm_chart = base_chart.model_copy(update={'wait': True})
+    with caplog.at_level(logging.DEBUG, logger='App.HelmManager'):
+        HelmManager.get_install_args(helm_chart)
+    assert logged_messages(caplog, logging.INFO) == [f'Will wait for Helm chart "{helm_chart.chart}" to start up.']
@@ -1,5 +1,6 @@
+import itertools
 import os
-from copy import deepcopy
+from contextlib import suppress
 from unittest.mock import patch, MagicMock
 
 import pytest
@@ -10,6 +11,11 @@ from kubesandbox.k3d.manager import K3dManager, ClusterConfig
 from kubesandbox.planner.support import Step, DisplayMessages
 from kubesandbox.storage import Resource
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
 default_cluster_config = {
     'apiVersion': 'k3d.io/v1alpha4',
     'kind': 'Simple',
@@ -19,216 +25,95 @@ default_cluster_config = {
     'subnet': 'auto'
 }
 
+expected_create_cluster_step = Step(
+    name='Create cluster',
+    dependencies=['k3d'],
+    optional=False,
+    command='k3d',
+    args=['cluster', 'create', '--config', 'k3d-config.yaml'],
+    display_messages=DisplayMessages(
+        ongoing_message='Creating cluster',
+        success_message='Cluster created successfully',
+        failure_message='Cluster creation failed. If you are using rootless docker, run the '
+                        '"Patch permissions for rootless docker" option from the menu then try again.'
+    ),
+    on_success=Step(
+        name='merge_kube_config',
+        dependencies=['k3d'],
+        optional=False,
+        quoted_command='k3d kubeconfig merge my-cluster --kubeconfig-merge-default &> /dev/null',
+        display_messages=DisplayMessages(
+            ongoing_message='Updating kubeconfig',
+            success_message='Kubeconfig updated',
+            failure_message='Kubeconfig update failed'
+        )
+    )
+)
+
 
 @pytest.fixture
-def mock_time():
-    with patch('kubesandbox.k3d.manager.time.time', return_value=1678886400):
+def mock_filename():
+    with patch('kubesandbox.k3d.manager.config_filename_prefix', 'k3d-config-1678886400'), \
+            patch('kubesandbox.k3d.manager.config_filename_counter', itertools.count()):
         yield
 
 
 @pytest.fixture
 def clean_up():
     yield
-    for filename in ['k3d-config-1678886400.yaml']:
-        if os.path.exists(filename):
-            os.remove(filename)
-
-
-def test_write_cluster_config_basic(mock_time, clean_up):
-    cluster_config = ClusterConfig.model_validate({
-        'apiVersion': 'k3d.io/v1alpha4',
-        'kind': 'Simple',
-        'metadata': {'name': 'sandbox'},
-        'agents': 2,
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'registries': {'use': ['k3d-reg:41953']},
-        'servers': 1,
-        'subnet': 'auto',
-        'options': {
-            'k3s': {
-                'extraArgs': [
-                    {
-                        'arg': '--disable=traefik',
-                        'nodeFilters': ['server:*']
-                    }
-                ]
-            }
-        }
-    })
+    with suppress(FileNotFoundError):
+        os.remove('k3d-config-1678886400-0.yaml')
 
-    filename = K3dManager.write_cluster_config(cluster_config)
-
-    assert filename == os.path.abspath('k3d-config-1678886400.yaml')
-
-    with open(filename, 'r') as f:
-        data = yaml.safe_load(f)
-
-    expected_data = deepcopy(default_cluster_config)
-
-    expected_data.update(
-        {
-            'metadata': {'name': 'sandbox'},
-            'agents': 2,
-            'ports': [
-                {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-                {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-            ],
-            'registries': {'use': ['k3d-reg:41953']},
-            'options': {'k3s': {'extraArgs': [{'arg': '--disable=traefik', 'nodeFilters': ['server:*']}]}}
-        })
-
-    assert data == expected_data
-
-    assert len(config.storage.resources) == 1
-    assert config.storage.resources[0] == Resource(
-        name='K3D Config',
-        path='k3d-config-1678886400.yaml',
-        type='YAML file',
-        details='File containing the configuration for recreating the current K3D cluster. This cluster will '
-                'not contain the installed tools or packages.',
-        reference='https://k3d.io/v5.6.3/usage/configfile/'
-    )
 
+sample_ports = [
+    {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
+    {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
+]
 
-def test_write_cluster_config_no_options(mock_time, clean_up):
-    cluster_config = ClusterConfig.model_validate({
-        'metadata': {'name': 'sandbox'},
-        'agents': 2,
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'registries': {'use': ['k3d-reg:41953']}
-    })
+sample_registries = {'use': ['k3d-reg:41953']}
 
-    filename = K3dManager.write_cluster_config(cluster_config)
+sample_options = {'k3s': {'extraArgs': [{'arg': '--disable=traefik', 'nodeFilters': ['server:*']}]}}
 
-    assert filename == os.path.abspath('k3d-config-1678886400.yaml')
-
-    with open(filename, 'r') as f:
-        data = yaml.safe_load(f)
-
-    expected_data = deepcopy(default_cluster_config)
-
-    expected_data.update({
-        'metadata': {'name': 'sandbox'},
-        'agents': 2,
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'registries': {'use': ['k3d-reg:41953']}
-    })
-
-    assert data == expected_data
-
-
-def test_write_cluster_config_no_registries(mock_time, clean_up):
-    cluster_config = ClusterConfig.model_validate({
-        'metadata': {
-            'name': 'sandbox'
-        },
-        'agents': 2,
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'options': {
-            'k3s': {
-                'extraArgs': [
-                    {
-                        'arg': '--disable=traefik',
-                        'nodeFilters': ['server:*']
-                    }
-                ]
-            }
-        }
-    })
-
-    filename = K3dManager.write_cluster_config(cluster_config)
+expected_config_resource = Resource(
+    name='K3D Config',
+    path='k3d-config-1678886400-0.yaml',
+    type='YAML file',
+    details='File containing the configuration for recreating the current K3D cluster. This cluster will '
+            'not contain the installed tools or packages.',
+    reference='https://k3d.io/v5.6.3/usage/configfile/'
+)
 
-    assert filename == os.path.abspath('k3d-config-1678886400.yaml')
 
-    with open(filename, 'r') as f:
-        data = yaml.safe_load(f)
-
-    expected_data = deepcopy(default_cluster_config)
-
-    expected_data.update({
-        'metadata': {'name': 'sandbox'},
-        'agents': 2,
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'options': {'k3s': {'extraArgs': [{'arg': '--disable=traefik', 'nodeFilters': ['server:*']}]}}
-    })
-
-    assert data == expected_data
-
-
-def test_write_cluster_config_no_agents(mock_time, clean_up):
-    cluster_config = ClusterConfig.model_validate(
-        {
-            'metadata': {'name': 'sandbox'},
-            'ports': [
-                {
-                    'port': '8080:80',
-                    'nodeFilters':
-                        ['loadbalancer']
-                },
-                {
-                    'port': '8443:443',
-                    'nodeFilters': ['loadbalancer']
-                }
-            ],
-            'registries': {
-                'use': ['k3d-reg:41953']
-            },
-            'options': {
-                'k3s': {
-                    'extraArgs': [
-                        {
-                            'arg': '--disable=traefik',
-                            'nodeFilters': ['server:*']
-                        }
-                    ]
-                }
-            }
-        }
-    )
+@pytest.mark.parametrize('cluster_config_fields', [
+    {**default_cluster_config, 'agents': 2, 'ports': sample_ports, 'registries': sample_registries,
+     'options': sample_options},
+    {'metadata': {'name': 'sandbox'}, 'agents': 2, 'ports': sample_ports, 'registries': sample_registries},
+    {'metadata': {'name': 'sandbox'}, 'agents': 2, 'ports': sample_ports, 'options': sample_options},
+    {'metadata': {'name': 'sandbox'}, 'ports': sample_ports, 'registries': sample_registries,
+     'options': sample_options}
+], ids=['basic', 'no_options', 'no_registries', 'no_agents'])
+def test_write_cluster_config(mock_filename, clean_up, monkeypatch, cluster_config_fields):
+    monkeypatch.setattr(config.storage, 'resources', [])
+    cluster_config = ClusterConfig.model_validate(cluster_config_fields)
 
     filename = K3dManager.write_cluster_config(cluster_config)
 
-    assert filename == os.path.abspath('k3d-config-1678886400.yaml')
+    assert filename == os.path.abspath('k3d-config-1678886400-0.yaml')
 
     with open(filename, 'r') as f:
-        data = yaml.safe_load(f)
-
-    expected_data = deepcopy(default_cluster_config)
+        data = yaml.load(f, Loader=YamlLoader)
 
-    expected_data.update({
-        'metadata': {'name': 'sandbox'},
-        'ports': [
-            {'port': '8080:80', 'nodeFilters': ['loadbalancer']},
-            {'port': '8443:443', 'nodeFilters': ['loadbalancer']}
-        ],
-        'registries': {'use': ['k3d-reg:41953']},
-        'options': {'k3s': {'extraArgs': [{'arg': '--disable=traefik', 'nodeFilters': ['server:*']}]}}
-    })
+    assert data == {**default_cluster_config, **cluster_config_fields}
 
-    assert data == expected_data
+    assert config.storage.resources == [expected_config_resource]
 
 
 @pytest.fixture
-def mock_config():
-    config.node_port_base = 3000
-    config.run_in_user_namespace = False
-    config.storage = MagicMock()
-    config.storage.resources = []
+def mock_config(monkeypatch):
+    monkeypatch.setattr(config, 'node_port_base', 3000)
+    monkeypatch.setattr(config, 'run_in_user_namespace', False)
+    monkeypatch.setattr(config, 'storage', MagicMock())
+    monkeypatch.setattr(config.storage, 'resources', [])
 
 
 @pytest.mark.parametrize(
@@ -311,31 +196,6 @@ def test_prepare_cluster(mock_write_cluster_config, mock_config):
     nodeports = 3
     use_default_ingress = False
 
-    expected_step = Step(
-        name='Create cluster',
-        dependencies=['k3d'],
-        optional=False,
-        command='k3d',
-        args=['cluster', 'create', '--config', 'k3d-config.yaml'],
-        display_messages=DisplayMessages(
-            ongoing_message='Creating cluster',
-            success_message='Cluster created successfully',
-            failure_message='Cluster creation failed. If you are using rootless docker, run the '
-                            '"Patch permissions for rootless docker" option from the menu then try again.'
-        ),
-        on_success=Step(
-            name='merge_kube_config',
-            dependencies=['k3d'],
-            optional=False,
-            quoted_command='k3d kubeconfig merge my-cluster --kubeconfig-merge-default &> /dev/null',
-            display_messages=DisplayMessages(
-                ongoing_message='Updating kubeconfig',
-                success_message='Kubeconfig updated',
-                failure_message='Kubeconfig update failed'
-            )
-        )
-    )
-
     step = K3dManager.prepare_cluster(
         cluster_name=cluster_name,
         agents=agents,
@@ -345,7 +205,7 @@ def test_prepare_cluster(mock_write_cluster_config, mock_config):
         use_default_ingress=use_default_ingress
     )
 
-    assert step == expected_step
+    assert step == expected_create_cluster_step
     mock_write_cluster_config.assert_called_once()
 
 
@@ -359,31 +219,6 @@ def test_prepare_cluster_no_agents(mock_write_cluster_config, mock_config):
     nodeports = 3
     use_default_ingress = False
 
-    expected_step = Step(
-        name='Create cluster',
-        dependencies=['k3d'],
-        optional=False,
-        command='k3d',
-        args=['cluster', 'create', '--config', 'k3d-config.yaml'],
-        display_messages=DisplayMessages(
-            ongoing_message='Creating cluster',
-            success_message='Cluster created successfully',
-            failure_message='Cluster creation failed. If you are using rootless docker, run the '
-                            '"Patch permissions for rootless docker" option from the menu then try again.'
-        ),
-        on_success=Step(
-            name='merge_kube_config',
-            dependencies=['k3d'],
-            optional=False,
-            quoted_command='k3d kubeconfig merge my-cluster --kubeconfig-merge-default &> /dev/null',
-            display_messages=DisplayMessages(
-                ongoing_message='Updating kubeconfig',
-                success_message='Kubeconfig updated',
-                failure_message='Kubeconfig update failed'
-            )
-        )
-    )
-
     step = K3dManager.prepare_cluster(
         cluster_name=cluster_name,
         agents=agents,
@@ -393,7 +228,7 @@ def test_prepare_cluster_no_agents(mock_write_cluster_config, mock_config):
         use_default_ingress=use_default_ingress
     )
 
-    assert step == expected_step
+    assert step == expected_create_cluster_step
     mock_write_cluster_config.assert_called_once()
 
 
@@ -428,3 +263,48 @@ def test_prepare_cluster_no_agents(mock_write_cluster_config, mock_config):
 def test_prepare_registry(mock_config, registry, expected_step):
     step = K3dManager.prepare_registry(registry)
     assert step == expected_step
+
+
+@patch('kubesandbox.k3d.manager.K3dManager.write_cluster_config')
+def test_prepare_cluster_generated_config(mock_write_cluster_config, mock_config):
+    mock_write_cluster_config.return_value = 'k3d-config.yaml'
+
+    K3dManager.prepare_cluster(
+        cluster_name='my-cluster',
+        agents=2,
+        loadbalancer=(8080, 8443),
+        nodeports=1,
+        use_default_ingress=False
+    )
+
+    cluster_config_dict = mock_write_cluster_config.call_args.args[0]
+    assert cluster_config_dict == ClusterConfig.model_validate(cluster_config_dict).model_dump(exclude_none=True)
+
+
+def test_write_cluster_config_dict(mock_filename, clean_up, monkeypatch):
+    monkeypatch.setattr(config.storage, 'resources', [])
+    filename = K3dManager.write_cluster_config({**default_cluster_config, 'network': None, 'ports': []})
+
+    with open(filename, 'r') as f:
+        data = yaml.load(f, Loader=YamlLoader)
+
+    assert data == {**default_cluster_config, 'ports': []}
+    assert config.storage.resources == [expected_config_resource]
+
+
+def test_write_cluster_config_shared_node_filters(mock_filename, clean_up, monkeypatch):
+    monkeypatch.setattr(config.storage, 'resources', [])
+    ports = K3dManager.get_loadbalancer_config((8080, 8443))
+    filename = K3dManager.write_cluster_config({**default_cluster_config, 'ports': ports})
+
+    with open(filename, 'r') as f:
+        content = f.read()
+
+    assert '&id' not in content and '*id' not in content
+    assert yaml.load(content, Loader=YamlLoader) == {**default_cluster_config, 'ports': ports}
+    assert config.storage.resources == [expected_config_resource]
+
+
+def test_prepare_cluster_invalid_name(mock_config):
+    with pytest.raises(ValueError):
+        K3dManager.prepare_cluster(cluster_name='sandbox; rm -rf ~')
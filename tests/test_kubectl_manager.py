@@ -1,10 +1,3 @@
-from __future__ import annotations
-
-import os
-import uuid
-from pathlib import Path
-from unittest.mock import patch
-
 import pytest
 
 from kubesandbox import config
@@ -13,26 +6,13 @@ from kubesandbox.kubeclient.model import KubeObject
 from kubesandbox.planner.support import Step, DisplayMessages
 
 
-@pytest.fixture
-def setup_workdir():
-    config.workdir = '/tmp/kubesandbox'
-    config.storage.temp_files = []
-    Path(config.workdir).mkdir(parents=True, exist_ok=True)
-    yield
-    # Delete any generated files
-    for file in config.storage.temp_files:
-        if os.path.exists(file):
-            os.remove(file)
-
-
 @pytest.mark.parametrize("action, expected_args", [
     ('apply',
      ['apply', '-f', '/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml', '--namespace', 'test-namespace']),
     ('delete',
      ['delete', '-f', '/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml', '--namespace', 'test-namespace']),
 ])
-@patch('uuid.uuid4', return_value=uuid.UUID('12345678-1234-5678-1234-567812345678'))
-def test_kube_object_to_step(mock_uuid, action, expected_args, setup_workdir):
+def test_kube_object_to_step(action, expected_args):
     # Test converting a KubeObject to a Step for 'apply' action
     kube_object = KubeObject(
         name='test-deployment',
@@ -86,24 +66,56 @@ def test_kube_object_to_step(mock_uuid, action, expected_args, setup_workdir):
                     yaml_content='apiVersion: v1\nkind: Service\nmetadata:\n  name: test-service\nspec:\n  selector:\n    app: nginx\n  ports:\n  - protocol: TCP\n    port: 80\n    targetPort: 80'
                 )
             ],
-            'Apply Deployment for Test-Deployment'
+            'Apply Deployment, Service for Test-Deployment, Test-Service'
     )
 ])
-@patch('uuid.uuid4', side_effect=['12345678-1234-5678-1234-567812345678', '12345678-1234-5678-1234-567812345679'])
-def test_generate_kubectl_apply_step(mock_uuid, kube_objects, expected_step_name, setup_workdir):
-    # Test with multiple KubeObjects
+def test_generate_kubectl_apply_step(kube_objects, expected_step_name):
+    # Test with multiple KubeObjects batched into a single apply through the standard input
+    expected_step = Step(
+        args=['apply', '-f', '-'],
+        stdin='\n---\n'.join(kube_object.yaml_content for kube_object in kube_objects),
+        command='kubectl',
+        dependencies=['kubectl'],
+        display_messages=DisplayMessages(
+            failure_message='Failed to deploy Deployment, Service for Test-Deployment, Test-Service',
+            ongoing_message='Deploying Deployment, Service for Test-Deployment, Test-Service',
+            success_message='Deployed Deployment, Service for Test-Deployment, Test-Service'
+        ),
+        name=expected_step_name,
+        optional=True,
+        resources=[]
+    )
+
+    step = KubeManager.generate_kubectl_apply_step(kube_objects)
+
+    # Verify the generated step
+    assert step == expected_step
+
+
+def test_generate_kubectl_apply_step_with_yaml_file():
+    # Objects referencing a YAML file are applied separately and rolled back on failure
+    kube_objects = [
+        KubeObject(name='test-installer', kind='Installer', yaml_file='https://example.com/installer.yaml'),
+        KubeObject(
+            name='test-service',
+            kind='Service',
+            yaml_content='apiVersion: v1\nkind: Service\nmetadata:\n  name: test-service'
+        )
+    ]
+
     expected_step = Step(
-        args=['apply', '-f', '/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml'],
+        args=['apply', '-f', 'https://example.com/installer.yaml'],
         command='kubectl',
         dependencies=['kubectl'],
         display_messages=DisplayMessages(
-            failure_message='Failed to deploy Deployment for Test-Deployment',
-            ongoing_message='Deploying Deployment for Test-Deployment',
-            success_message='Deployed Deployment for Test-Deployment'
+            failure_message='Failed to deploy Installer for Test-Installer',
+            ongoing_message='Deploying Installer for Test-Installer',
+            success_message='Deployed Installer for Test-Installer'
         ),
-        name='Apply Deployment for Test-Deployment',
+        name='Apply Installer for Test-Installer',
         on_success=Step(
-            args=['apply', '-f', '/tmp/kubesandbox/12345678-1234-5678-1234-567812345679.yaml'],
+            args=['apply', '-f', '-'],
+            stdin='apiVersion: v1\nkind: Service\nmetadata:\n  name: test-service',
             command='kubectl',
             dependencies=['kubectl'],
             display_messages=DisplayMessages(
@@ -113,15 +125,15 @@ def test_generate_kubectl_apply_step(mock_uuid, kube_objects, expected_step_name
             ),
             name='Apply Service for Test-Service',
             on_failure=Step(
-                args=['delete', '-f', '/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml'],
+                args=['delete', '-f', 'https://example.com/installer.yaml'],
                 command='kubectl',
                 dependencies=['kubectl'],
                 display_messages=DisplayMessages(
-                    failure_message='Failed to delete Deployment for Test-Deployment',
-                    ongoing_message='Deleting Deployment for Test-Deployment',
-                    success_message='Deleted Deployment for Test-Deployment'
+                    failure_message='Failed to delete Installer for Test-Installer',
+                    ongoing_message='Deleting Installer for Test-Installer',
+                    success_message='Deleted Installer for Test-Installer'
                 ),
-                name='Delete Deployment for Test-Deployment',
+                name='Delete Installer for Test-Installer',
                 optional=True,
                 resources=[]),
             optional=True,
@@ -132,32 +144,13 @@ def test_generate_kubectl_apply_step(mock_uuid, kube_objects, expected_step_name
 
     step = KubeManager.generate_kubectl_apply_step(kube_objects)
 
-    # Verify the generated step
-    assert step.model_dump(exclude_unset=True, exclude_none=True) == expected_step.model_dump(exclude_unset=True,
-                                                                                              exclude_none=True)
-
-    # Verify the generated YAML files
-    assert os.path.exists('/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml')
-    with open('/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml', 'r') as f:
-        assert f.read() == kube_objects[0].yaml_content
-    if len(kube_objects) > 1:
-        assert os.path.exists('/tmp/kubesandbox/12345678-1234-5678-1234-567812345679.yaml')
-        with open('/tmp/kubesandbox/12345678-1234-5678-1234-567812345679.yaml', 'r') as f:
-            assert f.read() == kube_objects[1].yaml_content
-
-
-@patch('uuid.uuid4', return_value=uuid.UUID('12345678-1234-5678-1234-567812345678'))
-def test_write_content_to_file(mock_uuid, setup_workdir):
-    # Test writing content to a file
-    kube_object = KubeObject(
-        name='test-deployment',
-        kind='Deployment',
-        yaml_content='apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: test-deployment\nspec:\n  replicas: 3\n  selector:\n    matchLabels:\n      app: nginx\n  template:\n    metadata:\n      labels:\n        app: nginx\n    spec:\n      containers:\n      - name: nginx\n        image: nginx:1.14.2'
-    )
+    assert step == expected_step
 
-    filename = KubeManager.write_content_to_file(kube_object)
 
-    assert filename == '/tmp/kubesandbox/12345678-1234-5678-1234-567812345678.yaml'
-    assert os.path.exists(filename)
-    with open(filename, 'r') as f:
-        assert f.read() == kube_object.yaml_content
+@pytest.mark.parametrize("kube_object", [
+    {'name': 'test-deployment'},
+    {'name': 'test-deployment', 'yaml_file': 'deployment.yaml', 'yaml_content': 'kind: Deployment'},
+])
+def test_kube_object_list_validation(kube_object):
+    with pytest.raises(ValueError):
+        config.kube_object_list_adapter.validate_python([kube_object])